@@ -1,5 +1,6 @@
 from pathlib import Path
 import os
+import tempfile
 from corsheaders.defaults import default_headers
 
 
@@ -43,6 +44,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "utils.middleware.RequestMetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -99,6 +101,101 @@ DATABASES = {
     }
 }
 
+# "sqlite-production" keeps connections open per worker, takes the write lock
+# when a transaction starts and applies the PRAGMAs from utils.database
+# (WAL, synchronous=NORMAL, busy_timeout, mmap_size, cache_size).
+DATABASE_PROFILE = os.getenv("DJANGO_DATABASE_PROFILE", "default")
+if DATABASE_PROFILE == "sqlite-production":
+    DATABASES["default"].update(
+        {
+            "CONN_MAX_AGE": int(os.getenv("DJANGO_DB_CONN_MAX_AGE", "600")),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {"transaction_mode": "IMMEDIATE"},
+        }
+    )
+
+SQLITE_TUNING = {
+    "BUSY_TIMEOUT": int(os.getenv("DJANGO_SQLITE_BUSY_TIMEOUT", "5000")),
+    "MMAP_SIZE": int(os.getenv("DJANGO_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "CACHE_SIZE": int(os.getenv("DJANGO_SQLITE_CACHE_SIZE", "-20000")),
+}
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # Anonymous offer responses. The default file based cache is shared by
+    # all gunicorn workers, so a write in one worker invalidates the others.
+    "responses": {
+        "BACKEND": os.getenv(
+            "DJANGO_RESPONSE_CACHE_BACKEND",
+            "django.core.cache.backends.filebased.FileBasedCache",
+        ),
+        "LOCATION": os.getenv(
+            "DJANGO_RESPONSE_CACHE_LOCATION",
+            os.path.join(tempfile.gettempdir(), "coderr-responses"),
+        ),
+        "TIMEOUT": int(os.getenv("DJANGO_RESPONSE_CACHE_TIMEOUT", "300")),
+    },
+}
+
+# Tests swap the shared caches above for in-process ones.
+TEST_RUNNER = "utils.test_runner.IsolatedTestRunner"
+
+# In-process token -> user cache used by CachedTokenAuthentication. Set an
+# alias from CACHES to share entries between gunicorn workers.
+TOKEN_AUTH_CACHE = {
+    "MAX_SIZE": int(os.getenv("DJANGO_TOKEN_CACHE_SIZE", "1024")),
+    "TTL": int(os.getenv("DJANGO_TOKEN_CACHE_TTL", "60")),
+    "CACHE_ALIAS": os.getenv("DJANGO_TOKEN_CACHE_ALIAS") or None,
+}
+
+# Server-Timing is sent to staff users and to requests carrying this token
+# in the X-Debug-Token header.
+REQUEST_METRICS = {
+    "DEBUG_TOKEN": os.getenv("DJANGO_DEBUG_TIMING_TOKEN") or None,
+}
+
+# Queries slower than this are logged with their plan and aggregated in the
+# SlowQuery table (see the slow_query_report command). Empty disables it.
+# Each statement is written at most once per RECORD_INTERVAL seconds; bind
+# parameters are only stored with CAPTURE_PARAMS.
+SLOW_QUERY_MS = os.getenv("DJANGO_SLOW_QUERY_MS", "200")
+SLOW_QUERY_LOG = {
+    "THRESHOLD_MS": float(SLOW_QUERY_MS) if SLOW_QUERY_MS else None,
+    "RECORD_INTERVAL": float(os.getenv("DJANGO_SLOW_QUERY_INTERVAL", "60")),
+    "CAPTURE_PARAMS": os.getenv("DJANGO_SLOW_QUERY_PARAMS", "False") == "True",
+}
+
+# /metrics aggregates the per-worker files in DIRECTORY; without one nothing
+# is written and only the answering worker is shown. Without a token only
+# direct requests from localhost are answered.
+METRICS = {
+    "DIRECTORY": os.getenv("DJANGO_METRICS_DIR") or None,
+    "TOKEN": os.getenv("DJANGO_METRICS_TOKEN") or None,
+    "FLUSH_INTERVAL": float(os.getenv("DJANGO_METRICS_FLUSH_INTERVAL", "5")),
+}
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "coder_app.requests": {
+            "handlers": ["console"],
+            "level": os.getenv("DJANGO_REQUEST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+        "coder_app.slow_queries": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+    },
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"
@@ -122,7 +219,7 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "utils.authentication.CachedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -4,10 +4,13 @@ from django.conf.urls.static import static
 from django.conf import settings
 from django.http import HttpResponseRedirect 
 
+from coder_app.views import metrics_view
+
 urlpatterns = [
     path("", lambda r: HttpResponseRedirect("/admin/")),
     path("admin/", admin.site.urls),
     path("api/", include("coder_app.urls")),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 if settings.DEBUG:
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from .models import BusinessProfile, CustomerProfile, Order, Offer, OfferDetail, Review
 from django.utils.html import format_html
+from utils.cache import bump_offer_cache_version
+from utils.utils import sync_offer_min_values
 
 
 class CustomerProfileAdmin(admin.ModelAdmin):
@@ -121,6 +123,29 @@ class OfferDetailAdmin(admin.ModelAdmin):
     list_filter = ("offer_type",)
     ordering = ("offer",)
 
+    def save_model(self, request, obj, form, change):
+        """
+        Keeps the offer's denormalized minimum price and delivery time in sync.
+        """
+        super().save_model(request, obj, form, change)
+        sync_offer_min_values(obj.offer)
+
+    def delete_model(self, request, obj):
+        offer = obj.offer
+        super().delete_model(request, obj)
+        sync_offer_min_values(offer)
+
+    def delete_queryset(self, request, queryset):
+        """
+        Re-syncs every affected offer, which also moves its updated_at for
+        the conditional GET validators, and drops cached offer responses.
+        """
+        offers = list(Offer.objects.filter(id__in=queryset.values("offer_id")))
+        super().delete_queryset(request, queryset)
+        for offer in offers:
+            sync_offer_min_values(offer)
+        bump_offer_cache_version()
+
 
 admin.site.register(BusinessProfile, BusinessProfileAdmin)
 admin.site.register(CustomerProfile, CustomerProfileAdmin)
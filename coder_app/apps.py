@@ -1,6 +1,18 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoderAppConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "coder_app"
+
+    def ready(self):
+        from coder_app import signals  # noqa: F401
+        from utils.database import enable_sqlite_production_profile, is_sqlite_production
+        from utils.search import ensure_search_index
+        from utils.slow_queries import enable_slow_query_log
+
+        post_migrate.connect(ensure_search_index, sender=self)
+        enable_slow_query_log()
+        if is_sqlite_production():
+            enable_sqlite_production_profile()
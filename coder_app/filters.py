@@ -1,6 +1,6 @@
 from django_filters import rest_framework as filters
-from coder_app.models import Offer
-from django.db.models import Q, Min
+from coder_app.models import Offer, Order
+from utils.search import search_offers
 
 
 class OfferFilter(filters.FilterSet):
@@ -8,7 +8,7 @@ class OfferFilter(filters.FilterSet):
     min_price = filters.NumberFilter(method="filter_min_price")
     max_price = filters.NumberFilter(method="filter_max_price")
     max_delivery_time = filters.NumberFilter(
-        field_name="details__delivery_time_in_days", lookup_expr="lte"
+        field_name="delivery_time_in_days", lookup_expr="lte"
     )
     search = filters.CharFilter(method="filter_search")
 
@@ -18,27 +18,32 @@ class OfferFilter(filters.FilterSet):
 
     def filter_min_price(self, queryset, name, value):
         """
-        Filter offers by minimum price.
+        Filter offers by minimum price, using the denormalized price column.
         """
 
-        return queryset.annotate(min_price=Min("details__variant_price")).filter(
-            min_price__gte=value
-        )
+        return queryset.filter(price__gte=value)
 
     def filter_max_price(self, queryset, name, value):
         """
-        Filter offers by maximum price.
+        Filter offers by maximum price, using the denormalized price column.
         """
 
-        return queryset.annotate(min_price=Min("details__variant_price")).filter(
-            min_price__lte=value
-        )
+        return queryset.filter(price__lte=value)
 
     def filter_search(self, queryset, name, value):
         """
-        Filters offers by searching in the title and description fields.
+        Filters offers by searching in the title and description fields,
+        using the full-text index when the database provides one.
         """
 
-        return queryset.filter(
-            Q(title__icontains=value) | Q(description__icontains=value)
-        )
+        return search_offers(queryset, value)
+
+
+class OrderFilter(filters.FilterSet):
+    status = filters.ChoiceFilter(choices=Order.STATUS_CHOICES)
+    created_after = filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="gte")
+    created_before = filters.IsoDateTimeFilter(field_name="created_at", lookup_expr="lt")
+
+    class Meta:
+        model = Order
+        fields = ["status", "created_after", "created_before"]
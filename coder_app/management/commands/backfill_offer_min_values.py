@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from coder_app.models import Offer
+from utils.utils import refresh_offer_min_values
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the denormalized minimum price and delivery time of every "
+        "offer from its details."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--offer",
+            type=int,
+            action="append",
+            dest="offer_ids",
+            help="Only refresh the given offer id (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        offers = Offer.objects.all()
+        if options["offer_ids"]:
+            offers = offers.filter(id__in=options["offer_ids"])
+
+        updated = refresh_offer_min_values(offers)
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {updated} offers."))
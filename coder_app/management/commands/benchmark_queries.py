@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from utils.benchmarks import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs query-level benchmarks against synthetic data. All generated "
+        "rows are rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("scenario", choices=sorted(SCENARIOS))
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[10_000, 100_000],
+            help="Number of synthetic rows per run.",
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--json", action="store_true", help="Print raw JSON.")
+
+    def handle(self, *args, **options):
+        rows = SCENARIOS[options["scenario"]](options["sizes"], options["repeat"])
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+
+        columns = list(rows[0]) if rows else []
+        self.stdout.write("  ".join(f"{column:>12}" for column in columns))
+        for row in rows:
+            self.stdout.write("  ".join(f"{str(row[column]):>12}" for column in columns))
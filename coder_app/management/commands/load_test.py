@@ -0,0 +1,94 @@
+import asyncio
+import json
+import tempfile
+from functools import partial
+
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.loadtest import (
+    get_journey_fixtures,
+    run_load_test,
+    start_server,
+    wait_for_server,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replays customer journeys (browse, open offer, order, review) against "
+        "a running server at a target request rate. Needs the data from "
+        "seed_benchmark_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--start-server",
+            action="store_true",
+            help="Start gunicorn on the port of --url for the duration of the run.",
+        )
+        parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers.")
+        parser.add_argument("--users", type=int, default=10, help="Virtual users.")
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=20.0,
+            help="Target requests per second for all users together (0 = unlimited).",
+        )
+        parser.add_argument("--duration", type=float, default=30.0, help="Seconds.")
+        parser.add_argument("--json", action="store_true", help="Print raw JSON.")
+
+    def handle(self, *args, **options):
+        fixtures = get_journey_fixtures()
+        if fixtures is None:
+            raise CommandError("No benchmark data found. Run seed_benchmark_data first.")
+
+        base_url = options["url"].rstrip("/")
+        server = server_log = None
+        if options["start_server"]:
+            port = base_url.rsplit(":", 1)[-1]
+            log_file = tempfile.TemporaryFile(mode="w+")
+            server = start_server(port, options["workers"], log_file)
+            server_log = partial(read_log, log_file)
+        try:
+            if not wait_for_server(base_url):
+                raise CommandError(f"No server answered at {base_url}.")
+            summary = asyncio.run(
+                run_load_test(
+                    base_url,
+                    fixtures,
+                    users=options["users"],
+                    rate=options["rate"],
+                    duration=options["duration"],
+                    server_log=server_log,
+                )
+            )
+        finally:
+            if server:
+                server.terminate()
+                server.wait()
+                log_file.close()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        self.write_summary(summary)
+
+    def write_summary(self, summary):
+        steps = summary.pop("steps")
+        for key, value in summary.items():
+            self.stdout.write(f"{key:>26}: {value}")
+        if summary["sqlite_lock_errors"] is None:
+            self.stdout.write("Lock errors are only counted with --start-server.")
+        if not steps:
+            return
+        self.stdout.write("")
+        columns = list(steps[0])
+        self.stdout.write("  ".join(f"{column:>13}" for column in columns))
+        for step in steps:
+            self.stdout.write("  ".join(f"{str(step[column]):>13}" for column in columns))
+
+
+def read_log(log_file):
+    log_file.seek(0)
+    return log_file.read().splitlines()
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from utils.search import install_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Recreates the offer full-text index (SQLite FTS5 table and triggers, "
+        "or the PostgreSQL GIN index) and refills it from the offer table. "
+        "Run it after migrations that rebuild the offer table on SQLite."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if not install_search_index(connection):
+            raise CommandError(
+                f"The {connection.vendor} database does not support the offer "
+                "search index; searches fall back to icontains."
+            )
+        self.stdout.write(self.style.SUCCESS("Offer search index rebuilt."))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from utils.utils import reconcile_business_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the per-business rating and order totals from the review "
+        "and order tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only reconcile the given business user id (may be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        reconciled = reconcile_business_stats(options["user_ids"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Reconciled stats for {reconciled} business users.")
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from utils.functions import reconcile_site_statistics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the materialized base info statistics from the offer, "
+        "review and business profile tables."
+    )
+
+    def handle(self, *args, **options):
+        statistics = reconcile_site_statistics()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciled statistics: {statistics.offer_count} offers, "
+                f"{statistics.review_count} reviews, "
+                f"{statistics.business_profile_count} business profiles."
+            )
+        )
@@ -0,0 +1,84 @@
+import json
+import logging
+from pathlib import Path
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from utils.benchmarks import compare_with_baseline, run_endpoint_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks every API endpoint against the data from "
+        "seed_benchmark_data and optionally compares with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--endpoint",
+            action="append",
+            dest="endpoints",
+            help="Only run endpoints whose key contains this text (may be repeated).",
+        )
+        parser.add_argument("--output", help="Write the results to this JSON file.")
+        parser.add_argument("--baseline", help="Compare with a previously written file.")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed relative p95 increase before a run counts as a regression.",
+        )
+
+    def handle(self, *args, **options):
+        request_logger = logging.getLogger("coder_app.requests")
+        level = request_logger.level
+        request_logger.setLevel(logging.WARNING)
+        try:
+            results = run_endpoint_benchmarks(options["repeat"], options["endpoints"])
+        except ObjectDoesNotExist:
+            raise CommandError("No benchmark data found. Run seed_benchmark_data first.")
+        finally:
+            request_logger.setLevel(level)
+
+        self.write_table(
+            [{"endpoint": key, **result} for key, result in results.items()]
+        )
+        if options["output"]:
+            Path(options["output"]).write_text(
+                json.dumps(
+                    {
+                        "created_at": timezone.now().isoformat(),
+                        "repeat": options["repeat"],
+                        "results": results,
+                    },
+                    indent=2,
+                )
+            )
+            self.stdout.write(f"Results written to {options['output']}.")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())["results"]
+            rows = compare_with_baseline(results, baseline, options["tolerance"])
+            self.stdout.write("")
+            self.write_table(rows)
+            regressions = [row["endpoint"] for row in rows if row["regression"]]
+            if regressions:
+                raise CommandError(f"Regressions: {', '.join(regressions)}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def write_table(self, rows):
+        if not rows:
+            return
+        columns = list(rows[0])
+        widths = {
+            column: max(len(column), *(len(str(row[column])) for row in rows))
+            for column in columns
+        }
+        self.stdout.write("  ".join(column.ljust(widths[column]) for column in columns))
+        for row in rows:
+            self.stdout.write(
+                "  ".join(str(row[column]).ljust(widths[column]) for column in columns)
+            )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.benchmarks import clear_benchmark_data, has_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a deterministic benchmark data set with bulk inserts. "
+        "All generated usernames start with 'bench-'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--businesses", type=int, default=50)
+        parser.add_argument("--customers", type=int, default=200)
+        parser.add_argument("--offers-per-business", type=int, default=5)
+        parser.add_argument("--orders-per-customer", type=int, default=5)
+        parser.add_argument("--reviews-per-customer", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated benchmark data first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["businesses"] < 1 or options["customers"] < 1:
+            raise CommandError("At least one business user and one customer are needed.")
+        if has_benchmark_data():
+            if not options["clear"]:
+                raise CommandError(
+                    "Benchmark data already exists. Pass --clear to replace it."
+                )
+            clear_benchmark_data()
+
+        counts = seed_benchmark_data(
+            businesses=options["businesses"],
+            customers=options["customers"],
+            offers_per_business=options["offers_per_business"],
+            orders_per_customer=options["orders_per_customer"],
+            reviews_per_customer=options["reviews_per_customer"],
+            seed=options["seed"],
+        )
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary}."))
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+
+from coder_app.models import SlowQuery
+from utils.slow_queries import get_slow_query_report
+
+
+class Command(BaseCommand):
+    help = "Lists the slowest normalized queries recorded by the slow-query log."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--order-by", choices=["total", "count", "max"], default="total"
+        )
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument(
+            "--plans", action="store_true", help="Include the captured query plans."
+        )
+        parser.add_argument(
+            "--clear", action="store_true", help="Delete all recorded slow queries."
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted, _ = SlowQuery.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} slow queries."))
+            return
+
+        queries = get_slow_query_report(options["order_by"], options["limit"])
+        if not queries:
+            self.stdout.write("No slow queries recorded.")
+            return
+
+        for query in queries:
+            average = query.total_ms / query.count if query.count else 0
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{query.count}x  total {query.total_ms:.1f} ms  "
+                    f"avg {average:.1f} ms  max {query.max_ms:.1f} ms  "
+                    f"[{query.view_name or '-'}]  last {query.last_seen:%Y-%m-%d %H:%M}"
+                )
+            )
+            self.stdout.write(f"  {query.sql}")
+            if query.params:
+                self.stdout.write(f"  params: {query.params}")
+            if options["plans"] and query.plan:
+                for line in query.plan.splitlines():
+                    self.stdout.write(f"    {line}")
+            self.stdout.write("")
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:34
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def backfill_min_values(apps, schema_editor):
+    Offer = apps.get_model("coder_app", "Offer")
+    OfferDetail = apps.get_model("coder_app", "OfferDetail")
+
+    def min_detail(field):
+        return Subquery(
+            OfferDetail.objects.filter(offer=OuterRef("pk"))
+            .order_by()
+            .values("offer")
+            .annotate(value=Min(field))
+            .values("value")
+        )
+
+    Offer.objects.update(
+        price=min_detail("variant_price"),
+        delivery_time_in_days=min_detail("delivery_time_in_days"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0029_alter_offer_options'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='offer',
+            name='delivery_time_in_days',
+            field=models.IntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='offer',
+            name='price',
+            field=models.DecimalField(blank=True, db_index=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.RunPython(backfill_min_values, migrations.RunPython.noop),
+    ]
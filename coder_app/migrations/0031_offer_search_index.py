@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:49
+
+import django.db.models.deletion
+import utils.search
+from django.db import migrations, models
+
+from utils.search import install_search_index, uninstall_search_index
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0030_offer_min_value_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OfferSearchIndex',
+            fields=[
+                ('offer', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='coder_app.offer')),
+                ('document', utils.search.SearchMatchField(db_column='coder_app_offer_search')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'coder_app_offer_search',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
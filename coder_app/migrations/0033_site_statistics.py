@@ -0,0 +1,47 @@
+# Generated by Django 5.1.3 on 2026-10-18 03:58
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def seed_site_statistics(apps, schema_editor):
+    SiteStatistics = apps.get_model("coder_app", "SiteStatistics")
+    Offer = apps.get_model("coder_app", "Offer")
+    Review = apps.get_model("coder_app", "Review")
+    BusinessProfile = apps.get_model("coder_app", "BusinessProfile")
+
+    ratings = Review.objects.aggregate(count=Count("id"), total=Sum("rating"))
+    SiteStatistics.objects.update_or_create(
+        pk=1,
+        defaults={
+            "offer_count": Offer.objects.count(),
+            "review_count": ratings["count"],
+            "rating_sum": ratings["total"] or 0,
+            "business_profile_count": BusinessProfile.objects.count(),
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0032_profile_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SiteStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('offer_count', models.PositiveIntegerField(default=0)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('business_profile_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'site statistics',
+            },
+        ),
+        migrations.RunPython(seed_site_statistics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.1.3 on 2026-10-18 04:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+ORDER_STATUS_FIELDS = {
+    "pending": "pending_orders",
+    "in_progress": "in_progress_orders",
+    "completed": "completed_orders",
+    "cancelled": "cancelled_orders",
+}
+
+
+def backfill_business_stats(apps, schema_editor):
+    BusinessStats = apps.get_model("coder_app", "BusinessStats")
+    Review = apps.get_model("coder_app", "Review")
+    Order = apps.get_model("coder_app", "Order")
+
+    stats = {}
+    for entry in (
+        Review.objects.order_by()
+        .values("business_user")
+        .annotate(total=Sum("rating"), count=Count("id"))
+    ):
+        values = stats.setdefault(entry["business_user"], {})
+        values["rating_sum"] = entry["total"] or 0
+        values["rating_count"] = entry["count"]
+    for entry in (
+        Order.objects.order_by()
+        .values("business_user", "status")
+        .annotate(count=Count("id"))
+    ):
+        field = ORDER_STATUS_FIELDS.get(entry["status"])
+        if field:
+            stats.setdefault(entry["business_user"], {})[field] = entry["count"]
+
+    BusinessStats.objects.bulk_create(
+        [BusinessStats(user_id=user_id, **values) for user_id, values in stats.items()],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('coder_app', '0033_site_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusinessStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='business_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('rating_sum', models.BigIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('pending_orders', models.PositiveIntegerField(default=0)),
+                ('in_progress_orders', models.PositiveIntegerField(default=0)),
+                ('completed_orders', models.PositiveIntegerField(default=0)),
+                ('cancelled_orders', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name_plural': 'business stats',
+            },
+        ),
+        migrations.RunPython(backfill_business_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+from django.db import migrations
+
+SNAPSHOT_FIELDS = [
+    "title",
+    "revisions",
+    "delivery_time_in_days",
+    "price",
+    "features",
+    "offer_type",
+]
+
+
+def backfill_order_snapshots(apps, schema_editor):
+    """
+    Copies the values the order API used to read through offer_detail onto
+    the order rows, so the serialized output stays the same.
+    """
+    Order = apps.get_model("coder_app", "Order")
+    orders = Order.objects.filter(offer_detail__isnull=False).select_related(
+        "offer_detail__offer"
+    )
+    batch = []
+    for order in orders.iterator(chunk_size=500):
+        detail = order.offer_detail
+        order.title = detail.offer.title
+        order.revisions = detail.revision_limit or 0
+        if detail.delivery_time_in_days is not None:
+            order.delivery_time_in_days = detail.delivery_time_in_days
+        order.price = detail.variant_price
+        order.features = detail.features or []
+        order.offer_type = detail.offer_type
+        batch.append(order)
+        if len(batch) == 500:
+            Order.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+            batch = []
+    if batch:
+        Order.objects.bulk_update(batch, SNAPSHOT_FIELDS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0034_business_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_order_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.3 on 2026-10-18 04:21
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+
+def remove_duplicate_reviews(apps, schema_editor):
+    """
+    Keeps the most recently updated review per reviewer and business user,
+    then recomputes the rating totals the removed reviews contributed to.
+    """
+    Review = apps.get_model("coder_app", "Review")
+    SiteStatistics = apps.get_model("coder_app", "SiteStatistics")
+    BusinessStats = apps.get_model("coder_app", "BusinessStats")
+
+    newest = Review.objects.filter(
+        reviewer=OuterRef("reviewer"), business_user=OuterRef("business_user")
+    ).order_by("-updated_at", "-id")
+    duplicates = Review.objects.exclude(id=Subquery(newest.values("id")[:1]))
+    affected = set(duplicates.values_list("business_user", flat=True))
+    if not affected:
+        return
+    duplicates.delete()
+
+    totals = Review.objects.aggregate(count=Count("id"), total=Sum("rating"))
+    SiteStatistics.objects.filter(pk=1).update(
+        review_count=totals["count"], rating_sum=totals["total"] or 0
+    )
+    for user_id in affected:
+        ratings = Review.objects.filter(business_user_id=user_id).aggregate(
+            count=Count("id"), total=Sum("rating")
+        )
+        BusinessStats.objects.filter(user_id=user_id).update(
+            rating_count=ratings["count"], rating_sum=ratings["total"] or 0
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coder_app', '0036_order_history_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('reviewer', 'business_user'), name='unique_review_per_business'),
+        ),
+    ]
@@ -1,13 +1,17 @@
 from django.db import models
 from django.contrib.auth.models import User
-from utils.utils import set_order_defaults
+from django.db import transaction
+from utils.utils import ORDER_STATUS_FIELDS, set_order_defaults
+from utils.search import SQLITE_TABLE, SearchMatchField
 
 
 class Offer(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
-    price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    delivery_time_in_days = models.IntegerField(null=True, blank=True)
+    price = models.DecimalField(
+        max_digits=10, decimal_places=2, null=True, blank=True, db_index=True
+    )
+    delivery_time_in_days = models.IntegerField(null=True, blank=True, db_index=True)
     image = models.ImageField(upload_to="offer_images/", null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -48,6 +52,27 @@ class OfferDetail(models.Model):
         return f"{self.offer_type} - {self.variant_title}"
 
 
+class OfferSearchIndex(models.Model):
+    """
+    Read-only mapping of the SQLite FTS5 index over offer titles and
+    descriptions. The table and its triggers are managed in utils/search.py.
+    """
+
+    offer = models.OneToOneField(
+        Offer,
+        on_delete=models.DO_NOTHING,
+        primary_key=True,
+        db_column="rowid",
+        related_name="search_index",
+    )
+    document = SearchMatchField(db_column=SQLITE_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = SQLITE_TABLE
+
+
 class Review(models.Model):
     rating = models.IntegerField()
     description = models.TextField()
@@ -69,6 +94,30 @@ class Review(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["reviewer", "business_user"], name="unique_review_per_business"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["business_user", "updated_at"],
+                name="review_business_updated_idx",
+            ),
+            models.Index(
+                fields=["reviewer", "updated_at"], name="review_reviewer_updated_idx"
+            ),
+            models.Index(
+                fields=["business_user", "rating"], name="review_business_rating_idx"
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        """
+        Saves atomically with the rating totals updated from post_save.
+        """
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Review by {self.reviewer} for (Business: {self.business_user}, Offer: {self.offer})"
@@ -86,6 +135,7 @@ class BusinessProfile(models.Model):
     working_hours = models.CharField(max_length=255, blank=True, null=True)
     email = models.EmailField(max_length=255, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     file = models.ImageField(upload_to="profile_images/", null=True, blank=True)
 
     def __str__(self):
@@ -99,6 +149,7 @@ class CustomerProfile(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     file = models.ImageField(upload_to="profile_images/", null=True, blank=True)
 
     def __str__(self):
@@ -154,34 +205,105 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["business_user", "status", "created_at"],
+                name="order_business_status_idx",
+            ),
+            models.Index(
+                fields=["customer_user", "created_at"],
+                name="order_customer_created_idx",
+            ),
+        ]
+
     def save(self, *args, **kwargs):
         """
         Override save method to set default values before saving.
+        Runs atomically with the business stats update from post_save.
         """
         set_order_defaults(self)
-        super().save(*args, **kwargs)
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Order {self.id} - {self.title}"
 
 
+class SiteStatistics(models.Model):
+    """
+    Single row of platform totals for the base info endpoint. Kept current by
+    signals in coder_app/signals.py and reconciled by a management command.
+    """
 
+    offer_count = models.PositiveIntegerField(default=0)
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.BigIntegerField(default=0)
+    business_profile_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        verbose_name_plural = "site statistics"
 
+    def __str__(self):
+        return "Site statistics"
 
 
+class BusinessStats(models.Model):
+    """
+    Running review and order totals for one business user, maintained by
+    signals in coder_app/signals.py so dashboards never scan history.
+    """
 
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="business_stats",
+    )
+    rating_sum = models.BigIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    pending_orders = models.PositiveIntegerField(default=0)
+    in_progress_orders = models.PositiveIntegerField(default=0)
+    completed_orders = models.PositiveIntegerField(default=0)
+    cancelled_orders = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        verbose_name_plural = "business stats"
 
+    def __str__(self):
+        return f"Stats for {self.user}"
+
+    @property
+    def average_rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum / self.rating_count
+
+    def order_count(self, status):
+        return getattr(self, ORDER_STATUS_FIELDS[status])
+
+
+class SlowQuery(models.Model):
+    """
+    One normalized query that exceeded the slow-query threshold, with
+    aggregate timings and the plan captured by utils/slow_queries.py.
+    """
+
+    fingerprint = models.CharField(max_length=40, unique=True)
+    sql = models.TextField()
+    params = models.TextField(blank=True)
+    view_name = models.CharField(max_length=255, blank=True)
+    plan = models.TextField(blank=True)
+    count = models.PositiveIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        verbose_name_plural = "slow queries"
 
-
-
-
-
-
-
-
-
-
-
+    def __str__(self):
+        return f"{self.count}x {self.sql[:80]}"
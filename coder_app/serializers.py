@@ -2,6 +2,9 @@
 from decimal import Decimal, ROUND_DOWN
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from django.db import transaction
+from utils.middleware import SerializerTimingMixin
+from utils.utils import PROFILE_RELATIONS
 from coder_app.models import (
     Offer,
     BusinessProfile,
@@ -20,6 +23,7 @@ from utils.profile_helpers import (
     validate_username_exists,
 )
 from django.core.validators import MinValueValidator
+from django.utils.functional import cached_property
 from utils.serializers_helpers import (
     calculate_min_price,
     calculate_min_delivery_time,
@@ -38,7 +42,7 @@ from utils.serializers_helpers import (
 )
 
 
-class UserProfileSerializer(serializers.ModelSerializer):
+class UserProfileSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     tel = serializers.CharField(source="business_profile.tel", read_only=True)
     created_at = serializers.DateTimeField(
         source="customer_profile.created_at", read_only=True
@@ -121,7 +125,7 @@ class LoginSerializer(serializers.Serializer):
     password = serializers.CharField(write_only=True)
 
 
-class OfferDetailSerializer(serializers.ModelSerializer):
+class OfferDetailSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
 
     class Meta:
@@ -132,7 +136,7 @@ class OfferDetailSerializer(serializers.ModelSerializer):
         return f"/offerdetails/{obj.id}/"
 
 
-class OfferDetailFullSerializer(serializers.ModelSerializer):
+class OfferDetailFullSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     title = serializers.CharField(source="variant_title")
     price = serializers.SerializerMethodField()
     revisions = serializers.IntegerField(source="revision_limit")
@@ -172,7 +176,7 @@ class OfferDetailFullSerializer(serializers.ModelSerializer):
         return float(Decimal(obj.variant_price).quantize(Decimal("0.00")))
 
 
-class OfferSerializer(serializers.ModelSerializer):
+class OfferSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
     details = serializers.SerializerMethodField()
     min_price = serializers.SerializerMethodField()
@@ -206,11 +210,19 @@ class OfferSerializer(serializers.ModelSerializer):
         ]
         
 
-    def get_details(self, obj):
+    @cached_property
+    def detail_serializer_class(self):
+        """
+        Resolves the detail serializer once instead of once per offer.
+        """
         request = self.context.get("request")
-        if request and request.resolver_match.view_name == "offer-detail":
-            return OfferDetailFullSerializer(obj.details.all(), many=True).data
-        return OfferDetailSerializer(obj.details.all(), many=True).data
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match and resolver_match.view_name == "offer-detail":
+            return OfferDetailFullSerializer
+        return OfferDetailSerializer
+
+    def get_details(self, obj):
+        return self.detail_serializer_class(obj.details.all(), many=True).data
 
     def get_min_price(self, obj):
         return calculate_min_price(obj)
@@ -221,6 +233,7 @@ class OfferSerializer(serializers.ModelSerializer):
     def get_user_details(self, obj):
         return extract_user_details(obj)
 
+    @transaction.atomic
     def create(self, validated_data):
         details_data = self.initial_data.get("details", [])
         user = self.context["request"].user
@@ -229,6 +242,7 @@ class OfferSerializer(serializers.ModelSerializer):
         create_offer_details(offer, details_data)
         return offer
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         details_data = self.initial_data.get("details", [])
         if details_data is None:
@@ -241,7 +255,7 @@ class OfferSerializer(serializers.ModelSerializer):
         return instance
     
 
-class BusinessProfileSerializer(serializers.ModelSerializer):
+class BusinessProfileSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     user = UserProfileSerializer(read_only=True)
     email = serializers.EmailField(source="user.email", read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
@@ -291,30 +305,9 @@ class BusinessProfileSerializer(serializers.ModelSerializer):
         return instance
 
 
-class OrderSerializer(serializers.ModelSerializer):
-    customer_user = serializers.PrimaryKeyRelatedField(
-        source="customer_user.id", read_only=True
-    )
-    business_user = serializers.PrimaryKeyRelatedField(
-        source="business_user.id", read_only=True
-    )
-    title = serializers.CharField(source="offer_detail.offer.title", read_only=True)
-    revisions = serializers.IntegerField(
-        source="offer_detail.revision_limit", read_only=True
-    )
-    delivery_time_in_days = serializers.IntegerField(
-        source="offer_detail.delivery_time_in_days", read_only=True
-    )
-    price = serializers.DecimalField(
-        source="offer_detail.variant_price",
-        max_digits=10,
-        decimal_places=2,
-        read_only=True,
-    )
-    features = serializers.ListField(
-        source="offer_detail.features", child=serializers.CharField(), read_only=True
-    )
-    offer_type = serializers.CharField(source="offer_detail.offer_type", read_only=True)
+class OrderSerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    customer_user = serializers.PrimaryKeyRelatedField(read_only=True)
+    business_user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
         model = Order
@@ -347,7 +340,7 @@ class OrderSerializer(serializers.ModelSerializer):
         return update_order_instance(instance, validated_data)
 
 
-class CustomerProfileSerializer(serializers.ModelSerializer):
+class CustomerProfileSerializer(SerializerTimingMixin, serializers.ModelSerializer):
     user = serializers.PrimaryKeyRelatedField(read_only=True)
 
     class Meta:
@@ -359,7 +352,11 @@ class CustomerProfileSerializer(serializers.ModelSerializer):
         return request.build_absolute_uri(obj.file.url) if obj.file else None
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SerializerTimingMixin, serializers.ModelSerializer):
+    business_user = serializers.PrimaryKeyRelatedField(
+        queryset=User.objects.select_related(*PROFILE_RELATIONS.values())
+    )
+
     class Meta:
         model = Review
         fields = [
@@ -385,21 +382,3 @@ class ReviewSerializer(serializers.ModelSerializer):
         return value
 
 
-    def validate(self, data):
-        """
-        Ensure the user has not already reviewed the business user.
-        """
-        request = self.context.get("request")
-        if not request:
-            raise serializers.ValidationError("Request context is missing.")
-
-        reviewer = request.user
-        business_user = data.get("business_user")  
-
-        if business_user and Review.objects.filter(reviewer=reviewer, business_user=business_user).exists():
-                raise serializers.ValidationError(
-                {"business_user": "You have already reviewed this business user."}
-            )
-        return data
-
-
@@ -0,0 +1,206 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from coder_app.models import (
+    BusinessProfile,
+    CustomerProfile,
+    Offer,
+    OfferDetail,
+    Order,
+    Review,
+)
+from utils.authentication import (
+    forget_profile_types,
+    invalidate_token,
+    invalidate_user_tokens,
+)
+from utils.cache import bump_offer_cache_version
+from utils.functions import adjust_site_statistics, reconcile_site_statistics
+from utils.utils import (
+    ORDER_STATUS_FIELDS,
+    adjust_business_stats,
+    reconcile_business_stats,
+)
+
+
+# User fields embedded in offer (user_details) and profile responses.
+USER_DETAIL_FIELDS = ("username", "first_name", "last_name", "email")
+
+
+@receiver(post_save, sender=Offer)
+@receiver(post_delete, sender=Offer)
+@receiver(post_save, sender=OfferDetail)
+@receiver(post_delete, sender=OfferDetail)
+def invalidate_offer_responses(sender, **kwargs):
+    """
+    Drops every cached offer response whenever an offer or detail changes.
+    """
+    bump_offer_cache_version()
+
+
+@receiver(post_init, sender=User)
+def remember_user_details(sender, instance, **kwargs):
+    """
+    Keeps the user fields embedded in offer and profile responses, so only
+    real changes invalidate them. Deferred fields stay unloaded.
+    """
+    instance._stored_user_details = tuple(
+        instance.__dict__.get(field) for field in USER_DETAIL_FIELDS
+    )
+
+
+@receiver(post_save, sender=User)
+def invalidate_owner_responses(sender, instance, created, **kwargs):
+    """
+    Drops cached offer responses when an embedded user field changes and
+    touches the user's profiles, whose updated_at feeds the offer and
+    profile validators. Saves that only touch other fields, such as
+    last_login on every login, keep them.
+    """
+    details = tuple(instance.__dict__.get(field) for field in USER_DETAIL_FIELDS)
+    if not created and details != instance._stored_user_details:
+        now = timezone.now()
+        for profile_model in (BusinessProfile, CustomerProfile):
+            profile_model.objects.filter(user_id=instance.pk).update(updated_at=now)
+        bump_offer_cache_version()
+    instance._stored_user_details = details
+
+
+@receiver(post_save, sender=Offer)
+def count_created_offer(sender, created, **kwargs):
+    if created:
+        adjust_site_statistics(offer_count=1)
+
+
+@receiver(post_delete, sender=Offer)
+def count_deleted_offer(sender, **kwargs):
+    adjust_site_statistics(offer_count=-1)
+
+
+@receiver(post_save, sender=BusinessProfile)
+def count_created_business_profile(sender, created, **kwargs):
+    if created:
+        adjust_site_statistics(business_profile_count=1)
+
+
+@receiver(post_delete, sender=BusinessProfile)
+def count_deleted_business_profile(sender, **kwargs):
+    adjust_site_statistics(business_profile_count=-1)
+
+
+@receiver(post_init, sender=Review)
+def remember_review_rating(sender, instance, **kwargs):
+    """
+    Keeps the stored rating and business user so updates can apply the
+    difference only. Deferred fields stay unloaded.
+    """
+    instance._stored_rating = instance.__dict__.get("rating")
+    instance._stored_business_user_id = instance.__dict__.get("business_user_id")
+
+
+@receiver(post_save, sender=Review)
+def count_saved_review(sender, instance, created, **kwargs):
+    if created:
+        adjust_site_statistics(review_count=1, rating_sum=instance.rating)
+        adjust_business_stats(
+            instance.business_user_id, rating_sum=instance.rating, rating_count=1
+        )
+    elif instance._stored_rating is None:
+        reconcile_site_statistics()
+        reconcile_business_stats_for(instance)
+    else:
+        adjust_site_statistics(rating_sum=instance.rating - instance._stored_rating)
+        if instance.business_user_id == instance._stored_business_user_id:
+            adjust_business_stats(
+                instance.business_user_id,
+                rating_sum=instance.rating - instance._stored_rating,
+            )
+        else:
+            adjust_business_stats(
+                instance._stored_business_user_id,
+                rating_sum=-instance._stored_rating,
+                rating_count=-1,
+            )
+            adjust_business_stats(
+                instance.business_user_id, rating_sum=instance.rating, rating_count=1
+            )
+    instance._stored_rating = instance.rating
+    instance._stored_business_user_id = instance.business_user_id
+
+
+@receiver(post_delete, sender=Review)
+def count_deleted_review(sender, instance, **kwargs):
+    rating = instance._stored_rating
+    if rating is None:
+        # Deferred rating: left to reconcile_site_statistics/business_stats.
+        return
+    adjust_site_statistics(review_count=-1, rating_sum=-rating)
+    adjust_business_stats(
+        instance._stored_business_user_id,
+        create_missing=False,
+        rating_sum=-rating,
+        rating_count=-1,
+    )
+
+
+@receiver(post_init, sender=Order)
+def remember_order_status(sender, instance, **kwargs):
+    instance._stored_status = instance.__dict__.get("status")
+    instance._stored_business_user_id = instance.__dict__.get("business_user_id")
+
+
+@receiver(post_save, sender=Order)
+def count_saved_order(sender, instance, created, **kwargs):
+    """
+    Moves the order between the status counters of its business user.
+    """
+    if created:
+        adjust_business_stats(
+            instance.business_user_id, **{ORDER_STATUS_FIELDS[instance.status]: 1}
+        )
+    elif instance._stored_status is None:
+        reconcile_business_stats_for(instance)
+    elif (instance._stored_status, instance._stored_business_user_id) != (
+        instance.status,
+        instance.business_user_id,
+    ):
+        adjust_business_stats(
+            instance._stored_business_user_id,
+            **{ORDER_STATUS_FIELDS[instance._stored_status]: -1},
+        )
+        adjust_business_stats(
+            instance.business_user_id, **{ORDER_STATUS_FIELDS[instance.status]: 1}
+        )
+    instance._stored_status = instance.status
+    instance._stored_business_user_id = instance.business_user_id
+
+
+@receiver(post_delete, sender=Order)
+def count_deleted_order(sender, instance, **kwargs):
+    if instance._stored_status is None:
+        return
+    adjust_business_stats(
+        instance._stored_business_user_id,
+        create_missing=False,
+        **{ORDER_STATUS_FIELDS[instance._stored_status]: -1},
+    )
+
+
+def reconcile_business_stats_for(instance):
+    """
+    Fallback for instances loaded with deferred fields, whose previous
+    values are unknown.
+    """
+    user_ids = {instance._stored_business_user_id, instance.business_user_id}
+    reconcile_business_stats([user_id for user_id in user_ids if user_id])
+
+
+post_delete.connect(invalidate_token, sender=Token)
+post_save.connect(invalidate_user_tokens, sender=User)
+post_delete.connect(invalidate_user_tokens, sender=User)
+for profile_model in (BusinessProfile, CustomerProfile):
+    post_save.connect(forget_profile_types, sender=profile_model)
+    post_delete.connect(forget_profile_types, sender=profile_model)
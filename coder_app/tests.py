@@ -2,10 +2,10 @@ from django.contrib.auth.models import User
 from django.contrib.auth import get_user_model
 User = get_user_model()
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, RequestFactory
+from django.test import LiveServerTestCase, TestCase, RequestFactory, override_settings
 from django.contrib.admin.sites import AdminSite
 from django.utils.html import escape
-from coder_app.models import CustomerProfile, User, BusinessProfile,  Offer, Order, OfferDetail, Review
+from coder_app.models import CustomerProfile, User, BusinessProfile,  Offer, Order, OfferDetail, Review, BusinessStats, SiteStatistics, SlowQuery
 from coder_app.admin import CustomerProfileAdmin,BusinessProfileAdmin,  OfferAdmin, OrderAdmin, ReviewAdmin, OfferDetailAdmin
 from unittest.mock import MagicMock
 from django.utils.timezone import timedelta
@@ -19,6 +19,42 @@ from unittest.mock import patch
 from time import sleep
 from rest_framework.test import APITestCase, APIRequestFactory
 from decimal import Decimal
+from django.db.models import Min
+from django.test.utils import CaptureQueriesContext
+from django.db import IntegrityError, OperationalError, connection, connections
+from django.core.management import call_command
+from io import StringIO
+import json
+from utils.functions import create_or_update_details, create_order, get_filtered_reviews, is_business_user, is_customer
+from utils.profile_helpers import get_user_profile_image, get_user_type
+from utils.search import get_search_backend
+from utils.cache import get_offer_cache_version, get_response_cache, get_response_cache_stats
+from utils.authentication import TokenCache, get_token_cache
+from utils.benchmarks import (
+    compare_with_baseline,
+    run_endpoint_benchmarks,
+    seed_benchmark_data,
+    sqlite_concurrency_scenario,
+)
+from utils.database import apply_sqlite_pragmas
+from utils.loadtest import LoadTestReport, build_journey, get_journey_fixtures, read_token, run_load_test
+import random
+from utils.slow_queries import SlowQueryBuffer, fingerprint_sql, flush_slow_queries
+from utils.metrics import MetricsStore, collect_metrics, get_metrics_store, render_metrics
+import os
+import tempfile
+from django.conf import settings
+import asyncio
+from rest_framework.authtoken.models import Token
+from rest_framework.throttling import AnonRateThrottle
+import logging
+
+# Keep the per-request metrics and slow-query logs out of the test output;
+# assertLogs lowers the level again where a test needs it.
+logging.getLogger("coder_app.requests").setLevel(logging.WARNING)
+logging.getLogger("coder_app.slow_queries").setLevel(logging.ERROR)
+
+
 class MockRequest:
     pass
 
@@ -107,6 +143,7 @@ class ReviewModelTest(TestCase):
         # Erstelle zwei Benutzer
         self.business_user = User.objects.create(username="business_user")
         self.reviewer = User.objects.create(username="reviewer")
+        self.second_reviewer = User.objects.create(username="second_reviewer")
 
         # Erstelle ein Angebot
         self.offer = Offer.objects.create(title="Test Offer", description="Description")
@@ -125,7 +162,7 @@ class ReviewModelTest(TestCase):
             rating=3,
             description="Okay service.",
             business_user=self.business_user,
-            reviewer=self.reviewer,
+            reviewer=self.second_reviewer,
             offer=self.offer,
             created_at=make_aware(datetime.now()),
         )
@@ -511,6 +548,20 @@ class OfferDetailAdminTest(TestCase):
     def test_ordering(self):
         self.assertEqual(self.admin.ordering, ("offer",))
 
+    def test_bulk_delete_resyncs_offer_and_cache(self):
+        OfferDetail.objects.create(
+            offer=self.offer, variant_title="Cheap", variant_price=80, delivery_time_in_days=9
+        )
+        Offer.objects.filter(id=self.offer.id).update(updated_at=timezone.now() - timedelta(days=1))
+        stale = Offer.objects.get(id=self.offer.id).updated_at
+        version = get_offer_cache_version()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.admin.delete_queryset(None, OfferDetail.objects.filter(variant_title="Cheap"))
+        offer = Offer.objects.get(id=self.offer.id)
+        self.assertEqual((offer.price, offer.delivery_time_in_days), (120, 5))
+        self.assertGreater(offer.updated_at, stale)
+        self.assertNotEqual(get_offer_cache_version(), version)
+
 # End of admin_logic.py
 
 
@@ -930,6 +981,1349 @@ class OfferSerializerTest(APITestCase):
         self.assertEqual(user_details["last_name"], "")
 
 
+    def test_min_values_use_annotations(self):
+        """Annotierte Minima werden ohne zusätzliche Query gelesen."""
+        offer = Offer.objects.annotate(
+            min_price=Min("details__variant_price"),
+            min_delivery_time=Min("details__delivery_time_in_days"),
+        ).get(id=self.offer.id)
+        serializer = OfferSerializer()
+        with self.assertNumQueries(0):
+            self.assertEqual(serializer.get_min_price(offer), 100.00)
+            self.assertEqual(serializer.get_min_delivery_time(offer), 5)
+
+    def test_min_values_use_prefetched_details(self):
+        """Vorgeladene Details werden statt einer Aggregation genutzt."""
+        offer = Offer.objects.prefetch_related("details").get(id=self.offer.id)
+        serializer = OfferSerializer()
+        with self.assertNumQueries(0):
+            self.assertEqual(serializer.get_min_price(offer), 100.00)
+            self.assertEqual(serializer.get_min_delivery_time(offer), 5)
+
+
+class OfferListQueryCountTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        for index in range(12):
+            offer = Offer.objects.create(
+                title=f"Offer {index}", description="Description", user=self.user
+            )
+            for offer_type, price in (("basic", 10), ("standard", 20), ("premium", 30)):
+                OfferDetail.objects.create(
+                    offer=offer,
+                    variant_title=offer_type,
+                    variant_price=price + index,
+                    revision_limit=1,
+                    delivery_time_in_days=3,
+                    features=["Feature"],
+                    offer_type=offer_type,
+                )
+
+    def count_aggregate_queries(self, page_size):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(f"/api/offers/?page_size={page_size}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return sum("MIN(" in query["sql"].upper() for query in context.captured_queries)
+
+    def test_min_values_do_not_scale_with_page_size(self):
+        """Die Anzahl der MIN()-Queries ist unabhängig von der Seitengröße."""
+        self.assertEqual(self.count_aggregate_queries(2), self.count_aggregate_queries(10))
+
+    def test_offer_list_uses_constant_queries(self):
+        """Validatoren, Count, Seite und vorgeladene Details: vier Queries pro Seite."""
+        for page_size in (2, 10):
+            with self.assertNumQueries(4):
+                response = self.client.get(f"/api/offers/?page_size={page_size}")
+            self.assertEqual(len(response.data["results"]), page_size)
+            self.assertEqual(len(response.data["results"][0]["details"]), 3)
+            self.assertEqual(
+                response.data["results"][0]["user_details"]["username"], "seller"
+            )
+
+
+
+class OfferMinValuesSyncTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        factory = APIRequestFactory()
+        request = factory.post("/offers/")
+        request.user = self.user
+        data = {
+            "title": "Synced Offer",
+            "description": "Description",
+            "details": [
+                {
+                    "title": title,
+                    "price": price,
+                    "revisions": 1,
+                    "delivery_time_in_days": days,
+                    "features": ["Feature"],
+                    "offer_type": offer_type,
+                }
+                for title, price, days, offer_type in (
+                    ("Basic", 50, 9, "basic"),
+                    ("Standard", 80, 5, "standard"),
+                    ("Premium", 120, 2, "premium"),
+                )
+            ],
+        }
+        serializer = OfferSerializer(data=data, context={"request": request})
+        self.assertTrue(serializer.is_valid())
+        self.offer = serializer.save()
+
+    def test_create_stores_min_values(self):
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.price, Decimal("50.00"))
+        self.assertEqual(self.offer.delivery_time_in_days, 2)
+
+    def test_update_details_refreshes_min_values(self):
+        basic = self.offer.details.get(offer_type="basic")
+        create_or_update_details(
+            self.offer,
+            [
+                {
+                    "id": basic.id,
+                    "title": "Basic",
+                    "price": 95,
+                    "revisions": 1,
+                    "delivery_time_in_days": 1,
+                    "features": ["Feature"],
+                    "offer_type": "basic",
+                }
+            ],
+        )
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.price, Decimal("95.00"))
+        self.assertEqual(self.offer.delivery_time_in_days, 1)
+
+    def test_price_filter_does_not_join_details(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/offers/?min_price=40&max_price=60")
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["min_price"], 50.0)
+        offer_queries = [
+            query["sql"] for query in context.captured_queries
+            if 'FROM "coder_app_offer"' in query["sql"]
+        ]
+        self.assertTrue(offer_queries)
+        for sql in offer_queries:
+            self.assertNotIn("JOIN \"coder_app_offerdetail\"", sql)
+
+    def test_backfill_command(self):
+        Offer.objects.filter(id=self.offer.id).update(price=None, delivery_time_in_days=None)
+        call_command("backfill_offer_min_values", stdout=StringIO())
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.price, Decimal("50.00"))
+        self.assertEqual(self.offer.delivery_time_in_days, 2)
+
+
+class OfferCursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="seller", password="pw")
+        for index in range(7):
+            offer = Offer.objects.create(
+                title=f"Offer {index}", description="Description", user=self.user
+            )
+            if index != 3:
+                OfferDetail.objects.create(
+                    offer=offer,
+                    variant_title="Basic",
+                    variant_price=10 * (index % 3),
+                    delivery_time_in_days=2,
+                    features=["Feature"],
+                    offer_type="basic",
+                )
+        call_command("backfill_offer_min_values", stdout=StringIO())
+
+    def collect_ids(self, url):
+        ids = []
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            ids.extend(offer["id"] for offer in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_cursor_walks_every_offer_once(self):
+        ids = self.collect_ids("/api/offers/?cursor=&page_size=2&ordering=updated_at")
+        expected = list(Offer.objects.order_by("-updated_at", "-id").values_list("id", flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_cursor_handles_min_price_ties_and_nulls(self):
+        ids = self.collect_ids("/api/offers/?cursor=&page_size=2&ordering=min_price")
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+        prices = [Offer.objects.get(id=offer_id).price for offer_id in ids]
+        self.assertIsNone(prices[-1])
+        self.assertEqual(prices[:-1], sorted(prices[:-1]))
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get("/api/offers/?cursor=not-a-cursor")
+        self.assertEqual(response.status_code, 404)
+
+
+class OfferSearchTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        self.title_match = Offer.objects.create(
+            title="Logo Design", description="Vector artwork", user=self.user
+        )
+        self.description_match = Offer.objects.create(
+            title="Branding", description="Includes a logo and colours", user=self.user
+        )
+        Offer.objects.create(title="Website", description="Django backend", user=self.user)
+
+    def search_ids(self, term):
+        response = self.client.get("/api/offers/", {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [offer["id"] for offer in response.data["results"]]
+
+    def test_uses_full_text_index(self):
+        self.assertEqual(get_search_backend(), "sqlite")
+
+    def test_prefix_match_ranks_title_first(self):
+        self.assertEqual(
+            self.search_ids("log"), [self.title_match.id, self.description_match.id]
+        )
+        self.assertEqual(self.search_ids("desi"), [self.title_match.id])
+
+    def test_index_follows_offer_writes(self):
+        self.title_match.title = "Illustration"
+        self.title_match.save()
+        self.description_match.delete()
+        self.assertEqual(self.search_ids("logo"), [])
+        self.assertEqual(self.search_ids("illu"), [self.title_match.id])
+
+    def test_rebuild_command(self):
+        call_command("rebuild_offer_search_index", stdout=StringIO())
+        self.assertEqual(self.search_ids("backend"), [Offer.objects.get(title="Website").id])
+
+
+class OfferCombinedFilterQueryTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="seller", password="pw")
+        for index, days in enumerate((2, 4, 9)):
+            offer = Offer.objects.create(
+                title=f"Logo package {index}", description="Design", user=self.user
+            )
+            for offer_type, price, extra_days in (
+                ("basic", 50, 0),
+                ("standard", 80, 1),
+                ("premium", 120, 2),
+            ):
+                OfferDetail.objects.create(
+                    offer=offer,
+                    variant_title=offer_type,
+                    variant_price=price + index,
+                    delivery_time_in_days=days + extra_days,
+                    features=["Feature"],
+                    offer_type=offer_type,
+                )
+        call_command("backfill_offer_min_values", stdout=StringIO())
+
+    def test_combined_filters_scan_details_once(self):
+        """Preis-, Lieferzeit- und Suchfilter joinen OfferDetail nicht erneut."""
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                "/api/offers/",
+                {"min_price": 40, "max_price": 60, "max_delivery_time": 5, "search": "logo"},
+            )
+        self.assertEqual(response.status_code, 200)
+        ids = [offer["id"] for offer in response.data["results"]]
+        self.assertEqual(response.data["count"], 2)
+        self.assertEqual(len(ids), len(set(ids)))
+
+        detail_queries = [
+            query["sql"] for query in context.captured_queries
+            if "coder_app_offerdetail" in query["sql"]
+        ]
+        self.assertEqual(len(detail_queries), 1)
+        self.assertTrue(detail_queries[0].startswith('SELECT "coder_app_offerdetail"'))
+
+
+class OfferResponseCacheTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        self.offer = Offer.objects.create(
+            title="Cached Offer", description="Description", user=self.user
+        )
+        self.detail = OfferDetail.objects.create(
+            offer=self.offer,
+            variant_title="Basic",
+            variant_price=10,
+            delivery_time_in_days=2,
+            features=["Feature"],
+            offer_type="basic",
+        )
+
+    def test_repeated_anonymous_reads_skip_the_database(self):
+        first = self.client.get("/api/offers/?page_size=5&ordering=min_price")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/offers/?ordering=min_price&page_size=5")
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(
+            get_response_cache_stats()["offer-list"], {"hits": 1, "misses": 1}
+        )
+
+    def test_offer_and_detail_writes_invalidate(self):
+        self.client.get("/api/offers/")
+        self.client.get(f"/api/offerdetails/{self.detail.id}/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.offer.title = "Renamed Offer"
+            self.offer.save()
+            self.detail.variant_title = "Renamed Basic"
+            self.detail.save()
+        self.assertEqual(
+            self.client.get("/api/offers/").data["results"][0]["title"], "Renamed Offer"
+        )
+        self.assertEqual(
+            self.client.get(f"/api/offerdetails/{self.detail.id}/").data["title"],
+            "Renamed Basic",
+        )
+
+    def test_owner_rename_invalidates(self):
+        self.client.get("/api/offers/")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.first_name = "New"
+            self.user.save()
+        owner = self.client.get("/api/offers/").data["results"][0]["user_details"]
+        self.assertEqual(owner["first_name"], "New")
+
+    def test_login_keeps_cached_offers(self):
+        self.client.get("/api/offers/")
+        self.client.post("/api/login/", {"username": "seller", "password": "pw"})
+        self.client.get("/api/offers/")
+        self.assertEqual(
+            get_response_cache_stats()["offer-list"], {"hits": 1, "misses": 1}
+        )
+
+    def test_suite_uses_an_in_process_cache(self):
+        self.assertIn("LocMemCache", type(get_response_cache()).__name__)
+
+    def test_authenticated_reads_bypass_cache(self):
+        self.client.force_authenticate(self.user)
+        self.client.get("/api/offers/")
+        self.client.get("/api/offers/")
+        self.assertEqual(
+            get_response_cache_stats()["offer-list"], {"hits": 0, "misses": 0}
+        )
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        self.profile = BusinessProfile.objects.create(
+            user=self.user, company_name="Seller", company_address="Street"
+        )
+        self.offer = Offer.objects.create(
+            title="Offer", description="Description", user=self.user
+        )
+        self.client.force_authenticate(self.user)
+
+    def assert_revalidates(self, url):
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn("ETag", first)
+        second = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(second.status_code, 304)
+        third = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(third.status_code, 304)
+        return first["ETag"]
+
+    def test_offer_list_and_detail(self):
+        list_etag = self.assert_revalidates("/api/offers/")
+        detail_etag = self.assert_revalidates(f"/api/offers/{self.offer.id}/")
+        self.offer.title = "Changed"
+        self.offer.save()
+        response = self.client.get("/api/offers/", HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            f"/api/offers/{self.offer.id}/", HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_owner_rename_changes_offer_validators(self):
+        list_etag = self.client.get("/api/offers/")["ETag"]
+        detail_etag = self.client.get(f"/api/offers/{self.offer.id}/")["ETag"]
+        self.user.last_name = "Renamed"
+        self.user.save()
+        response = self.client.get("/api/offers/", HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["results"][0]["user_details"]["last_name"], "Renamed")
+        response = self.client.get(
+            f"/api/offers/{self.offer.id}/", HTTP_IF_NONE_MATCH=detail_etag
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_validators_skip_serialization(self):
+        etag = self.client.get("/api/offers/")["ETag"]
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/offers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_anonymous_cache_hit_revalidates_without_queries(self):
+        self.client.force_authenticate(None)
+        etag = self.client.get("/api/offers/")["ETag"]
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/offers/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_reviews_and_profiles(self):
+        Review.objects.create(
+            business_user=self.user, reviewer=self.user, rating=5, description="Top"
+        )
+        self.assert_revalidates("/api/reviews/")
+        self.assert_revalidates(f"/api/profile/{self.user.id}/")
+        self.assert_revalidates(f"/api/profiles/business/{self.user.id}/")
+        self.assert_revalidates("/api/profiles/business/")
+
+    def test_email_change_outside_profile_patch_changes_profile_validators(self):
+        etag = self.client.get(f"/api/profile/{self.user.id}/")["ETag"]
+        self.user.email = "new@example.com"
+        self.user.save()
+        response = self.client.get(f"/api/profile/{self.user.id}/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["email"], "new@example.com")
+
+
+class SiteStatisticsTest(APITestCase):
+    def setUp(self):
+        self.business = User.objects.create_user(username="business", password="pw")
+        self.customer = User.objects.create_user(username="customer", password="pw")
+        BusinessProfile.objects.create(
+            user=self.business, company_name="Company", company_address="Street 1"
+        )
+        self.offer = Offer.objects.create(
+            user=self.business, title="Offer", description="Description"
+        )
+        self.review = Review.objects.create(
+            business_user=self.business, reviewer=self.customer, rating=4, description="Good"
+        )
+        Review.objects.create(
+            business_user=self.business, reviewer=self.business, rating=5, description="Great"
+        )
+
+    def test_base_info_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/base-info/")
+        self.assertEqual(
+            response.data,
+            {
+                "review_count": 2,
+                "average_rating": 4.5,
+                "business_profile_count": 1,
+                "offer_count": 1,
+            },
+        )
+
+    def test_signals_track_updates_and_deletes(self):
+        self.review.rating = 1
+        self.review.save()
+        Offer.objects.get(id=self.offer.id).delete()
+        data = self.client.get("/api/base-info/").data
+        self.assertEqual(data["average_rating"], 3.0)
+        self.assertEqual(data["offer_count"], 0)
+
+        self.business.delete()
+        data = self.client.get("/api/base-info/").data
+        self.assertEqual(data["review_count"], 0)
+        self.assertEqual(data["business_profile_count"], 0)
+
+    def test_reconcile_command_repairs_drift(self):
+        Review.objects.filter(id=self.review.id).update(rating=1)
+        Offer.objects.filter(id=self.offer.id).delete()
+        Offer.objects.bulk_create(
+            [Offer(user=self.business, title="Bulk", description="Bulk")] * 3
+        )
+        call_command("reconcile_site_statistics", stdout=StringIO())
+        data = self.client.get("/api/base-info/").data
+        self.assertEqual(data["offer_count"], 3)
+        self.assertEqual(data["average_rating"], 3.0)
+
+    def test_drifted_counters_stop_at_zero(self):
+        SiteStatistics.objects.update(offer_count=0)
+        Offer.objects.get(id=self.offer.id).delete()
+        self.assertEqual(self.client.get("/api/base-info/").data["offer_count"], 0)
+
+
+class BusinessStatsTest(APITestCase):
+    def setUp(self):
+        self.business = User.objects.create_user(username="business", password="pw")
+        self.customer = User.objects.create_user(username="customer", password="pw")
+        self.profile = BusinessProfile.objects.create(
+            user=self.business, company_name="Company", company_address="Street 1"
+        )
+        self.offer = Offer.objects.create(
+            user=self.business, title="Offer", description="Description"
+        )
+        self.detail = OfferDetail.objects.create(
+            offer=self.offer, variant_title="Basic", variant_price=50, delivery_time_in_days=3
+        )
+        self.client.force_authenticate(self.customer)
+
+    def create_order(self, status="in_progress"):
+        return Order.objects.create(
+            customer_user=self.customer,
+            business_user=self.business,
+            offer=self.offer,
+            offer_detail=self.detail,
+            status=status,
+        )
+
+    def test_order_counts_follow_status_changes(self):
+        order = self.create_order()
+        self.create_order()
+        order.status = "completed"
+        order.save()
+        self.create_order(status="cancelled").delete()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/order-count/{self.business.id}/")
+        self.assertEqual(response.data, {"order_count": 1})
+        response = self.client.get(f"/api/completed-order-count/{self.business.id}/")
+        self.assertEqual(response.data, {"completed_order_count": 1})
+        self.assertEqual(self.business.business_stats.cancelled_orders, 0)
+
+    def test_profile_serializer_reads_stats(self):
+        review = Review.objects.create(
+            business_user=self.business, reviewer=self.customer, rating=5, description="Top"
+        )
+        Review.objects.create(
+            business_user=self.business, reviewer=self.business, rating=2, description="Meh"
+        )
+        review.rating = 4
+        review.save()
+        self.create_order()
+
+        profile = BusinessProfile.objects.select_related(
+            "user__business_stats", "user__customer_profile"
+        ).get(id=self.profile.id)
+        with self.assertNumQueries(0):
+            data = BusinessProfileSerializer(profile).data
+        self.assertEqual(data["avg_rating"], 3.0)
+        self.assertEqual(data["pending_orders"], 1)
+
+    def test_drifted_counters_stop_at_zero(self):
+        order = self.create_order()
+        review = Review.objects.create(
+            business_user=self.business, reviewer=self.customer, rating=5, description="Top"
+        )
+        BusinessStats.objects.update(in_progress_orders=0, rating_count=0, rating_sum=0)
+        order.status = "completed"
+        order.save()
+        review.delete()
+        stats = BusinessStats.objects.get(user=self.business)
+        self.assertEqual(
+            (stats.in_progress_orders, stats.completed_orders, stats.rating_count, stats.rating_sum),
+            (0, 1, 0, 0),
+        )
+
+    def test_reconcile_command_and_user_deletion(self):
+        self.create_order()
+        Order.objects.update(status="completed")
+        call_command("reconcile_business_stats", stdout=StringIO())
+        stats = BusinessStats.objects.get(user=self.business)
+        self.assertEqual((stats.in_progress_orders, stats.completed_orders), (0, 1))
+
+        self.business.delete()
+        self.assertFalse(BusinessStats.objects.exists())
+
+
+class OrderStatsViewTest(APITestCase):
+    def setUp(self):
+        self.business = User.objects.create_user(username="business", password="pw")
+        self.customer = User.objects.create_user(username="customer", password="pw")
+        offer = Offer.objects.create(
+            user=self.business, title="Offer", description="Description"
+        )
+        detail = OfferDetail.objects.create(
+            offer=offer, variant_title="Basic", variant_price=50, delivery_time_in_days=3
+        )
+        for order_status in ("in_progress", "completed", "completed"):
+            Order.objects.create(
+                customer_user=self.customer,
+                business_user=self.business,
+                offer=offer,
+                offer_detail=detail,
+                status=order_status,
+            )
+        self.client.force_authenticate(self.customer)
+
+    def test_stats_cover_every_status_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/order-stats/{self.business.id}/")
+        self.assertEqual(
+            response.data,
+            {"pending": 0, "in_progress": 1, "completed": 2, "cancelled": 0},
+        )
+        self.assertEqual(self.client.get("/api/order-stats/999/").status_code, 404)
+
+    def test_batch_stats_for_many_business_users(self):
+        ids = f"{self.business.id},{self.customer.id},999"
+        with self.assertNumQueries(1):
+            response = self.client.get(f"/api/order-stats/?business_user_ids={ids}")
+        self.assertEqual(set(response.data), {self.business.id, self.customer.id})
+        self.assertEqual(response.data[self.customer.id]["pending"], 0)
+        self.assertEqual(
+            self.client.get("/api/order-stats/?business_user_ids=a,b").status_code, 400
+        )
+
+    def test_count_endpoints_wrap_the_stats(self):
+        response = self.client.get(f"/api/completed-order-count/{self.business.id}/")
+        self.assertEqual(response.data, {"completed_order_count": 2})
+        response = self.client.get("/api/order-count/999/")
+        self.assertEqual(response.status_code, 404)
+
+
+class OrderListQueryCountTest(APITestCase):
+    def setUp(self):
+        self.customer = User.objects.create_user(username="customer", password="pw")
+        CustomerProfile.objects.create(user=self.customer, first_name="C", last_name="U")
+        business = User.objects.create_user(username="business", password="pw")
+        self.offer = Offer.objects.create(
+            user=business, title="Logo Design", description="Description"
+        )
+        self.detail = OfferDetail.objects.create(
+            offer=self.offer,
+            variant_title="Basic",
+            variant_price=80,
+            delivery_time_in_days=4,
+            revision_limit=2,
+            offer_type="basic",
+            features=["Logo"],
+        )
+        self.client.force_authenticate(self.customer)
+
+    def test_order_list_query_count_is_constant(self):
+        for count in (1, 10):
+            Order.objects.all().delete()
+            for _ in range(count):
+                create_order(self.customer, self.detail)
+            self.client.force_authenticate(User.objects.get(id=self.customer.id))
+            with self.assertNumQueries(2):
+                response = self.client.get("/api/orders/")
+            self.assertEqual(len(response.data), count)
+
+    def test_orders_keep_their_snapshot(self):
+        create_order(self.customer, self.detail)
+        self.offer.title = "Renamed"
+        self.offer.save()
+        self.detail.variant_price = 999
+        self.detail.save()
+
+        order = self.client.get("/api/orders/").data[0]
+        self.assertEqual(order["title"], "Logo Design")
+        self.assertEqual(order["price"], "80.00")
+        self.assertEqual(order["revisions"], 2)
+        self.assertEqual(order["features"], ["Logo"])
+
+
+class OrderHistoryTest(APITestCase):
+    def setUp(self):
+        self.business = User.objects.create_user(username="business", password="pw")
+        BusinessProfile.objects.create(
+            user=self.business, company_name="Company", company_address="Street 1"
+        )
+        customer = User.objects.create_user(username="customer", password="pw")
+        offer = Offer.objects.create(
+            user=self.business, title="Offer", description="Description"
+        )
+        detail = OfferDetail.objects.create(
+            offer=offer,
+            variant_title="Basic",
+            variant_price=50,
+            delivery_time_in_days=3,
+            offer_type="basic",
+        )
+        self.start = timezone.now() - timedelta(days=30)
+        for index in range(25):
+            order = create_order(customer, detail)
+            Order.objects.filter(id=order.id).update(
+                created_at=self.start + timedelta(days=index % 10),
+                status="completed" if index % 2 else "in_progress",
+            )
+        self.client.force_authenticate(self.business)
+
+    def test_cursor_walks_every_order_newest_first(self):
+        url, seen = "/api/orders/?cursor=&page_size=10", []
+        while url:
+            response = self.client.get(url)
+            seen.extend((order["created_at"], order["id"]) for order in response.data["results"])
+            url = response.data["next"]
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_status_and_date_filters(self):
+        after = (self.start + timedelta(days=5)).isoformat()
+        response = self.client.get(
+            "/api/orders/", {"status": "completed", "created_after": after}
+        )
+        self.assertEqual(len(response.data), 6)
+        self.assertTrue(all(order["status"] == "completed" for order in response.data))
+        self.assertEqual(self.client.get("/api/orders/?status=unknown").status_code, 400)
+
+    def test_stream_returns_the_full_history(self):
+        response = self.client.get("/api/orders/?stream=true")
+        orders = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(len(orders), 25)
+        self.assertEqual(orders, self.client.get("/api/orders/?cursor=&page_size=25").json()["results"])
+
+
+class ProfileListQueryTest(APITestCase):
+    def setUp(self):
+        for index in range(5):
+            user = User.objects.create_user(username=f"business{index}", password="pw")
+            BusinessProfile.objects.create(
+                user=user,
+                company_name=f"Company {index}",
+                company_address="Street 1",
+                file=f"profile_images/logo {index}.png",
+            )
+            customer = User.objects.create_user(username=f"customer{index}", password="pw")
+            CustomerProfile.objects.create(user=customer, first_name="C", last_name="U")
+        self.client.force_authenticate(User.objects.get(username="customer0"))
+
+    def test_lists_use_constant_queries(self):
+        for url in ("/api/profiles/business/", "/api/profiles/customer/"):
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertEqual(len(response.data), 5)
+        self.assertEqual(response.data[0]["user"]["username"], "customer0")
+
+    def test_file_urls_share_the_media_prefix(self):
+        data = self.client.get("/api/profiles/business/").data
+        self.assertEqual(
+            data[0]["file"], "http://testserver/media/profile_images/logo%200.png"
+        )
+
+    def test_pagination_is_opt_in(self):
+        with self.assertNumQueries(3):
+            response = self.client.get("/api/profiles/business/?page_size=2&page=2")
+        self.assertEqual(response.data["count"], 5)
+        self.assertEqual(
+            [profile["user"]["username"] for profile in response.data["results"]],
+            ["business2", "business3"],
+        )
+
+
+class CachedTokenAuthenticationTest(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username="customer", password="pw")
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {self.token.key}")
+
+    def token_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/orders/")
+        queries = [q["sql"] for q in context.captured_queries if "authtoken_token" in q["sql"]]
+        return response, queries
+
+    def test_repeated_requests_skip_the_token_lookup(self):
+        response, queries = self.token_queries()
+        self.assertEqual((response.status_code, len(queries)), (200, 1))
+        response, queries = self.token_queries()
+        self.assertEqual((response.status_code, len(queries)), (200, 0))
+        self.assertEqual(get_token_cache().stats()["hit_ratio"], 0.5)
+
+    def test_deleted_token_and_inactive_user_are_rejected(self):
+        self.token_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get("/api/orders/").status_code, 401)
+
+        self.user.is_active = True
+        self.user.save()
+        self.token_queries()
+        self.token.delete()
+        self.assertEqual(self.client.get("/api/orders/").status_code, 401)
+
+    def test_lru_is_bounded(self):
+        token_cache = TokenCache(max_size=2, ttl=60)
+        for key in ("a", "b", "c"):
+            token_cache.set(key, User(id=1), None)
+        self.assertIsNone(token_cache.get("a"))
+        self.assertIsNotNone(token_cache.get("c"))
+        self.assertEqual(token_cache.stats()["size"], 2)
+
+
+class ProfileResolutionTest(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username="business", password="pw")
+        BusinessProfile.objects.create(
+            user=self.user,
+            company_name="Company",
+            company_address="Street 1",
+            file="profile_images/logo.png",
+        )
+
+    def test_profile_checks_share_one_query(self):
+        user = User.objects.get(id=self.user.id)
+        with self.assertNumQueries(1):
+            self.assertTrue(is_business_user(user))
+            self.assertFalse(is_customer(user))
+            self.assertEqual(get_user_type(user), "business")
+            self.assertEqual(get_user_profile_image(user), "/media/profile_images/logo.png")
+
+    def test_cached_token_carries_profile_types(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/api/orders/")
+        with self.assertNumQueries(1):
+            response = self.client.get("/api/orders/")
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_profile_invalidates_cached_types(self):
+        customer = User.objects.create_user(username="customer", password="pw")
+        token = Token.objects.create(user=customer)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/api/orders/")
+        CustomerProfile.objects.create(user=customer, first_name="C", last_name="U")
+        response = self.client.post("/api/orders/", {"offer_detail_id": 999})
+        self.assertNotEqual(response.status_code, 403)
+
+
+class OfferDetailBulkWriteTest(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="seller", password="pw")
+        self.offer = Offer.objects.create(user=self.user, title="Offer", description="D")
+
+    def detail_data(self, offer_type, price, **extra):
+        return {
+            "title": offer_type.title(),
+            "price": price,
+            "revisions": 1,
+            "delivery_time_in_days": 3,
+            "features": ["Feature"],
+            "offer_type": offer_type,
+            **extra,
+        }
+
+    def test_edit_uses_one_statement_per_change_kind(self):
+        create_or_update_details(
+            self.offer,
+            [
+                self.detail_data(offer_type, price)
+                for offer_type, price in (("basic", 10), ("standard", 20), ("premium", 30))
+            ],
+        )
+        details = list(self.offer.details.order_by("id"))
+        with CaptureQueriesContext(connection) as context:
+            create_or_update_details(
+                self.offer,
+                [
+                    self.detail_data("basic", 5, id=details[0].id),
+                    self.detail_data("standard", 25, id=details[1].id),
+                    self.detail_data("premium", 99),
+                ],
+            )
+        statements = [q["sql"].split()[0] for q in context.captured_queries]
+        self.assertEqual(statements.count("INSERT"), 1)
+        self.assertEqual(statements.count("DELETE"), 1)
+        detail_updates = [
+            q for q in context.captured_queries
+            if q["sql"].startswith('UPDATE "coder_app_offerdetail"')
+        ]
+        self.assertEqual(len(detail_updates), 1)
+        self.offer.refresh_from_db()
+        self.assertEqual(self.offer.price, Decimal("5.00"))
+        self.assertEqual(self.offer.details.count(), 3)
+
+    def test_failed_edit_rolls_back(self):
+        create_or_update_details(self.offer, [self.detail_data("basic", 10)])
+        detail = self.offer.details.get()
+        with self.assertRaises(Exception):
+            create_or_update_details(
+                self.offer,
+                [
+                    self.detail_data("basic", 20, id=detail.id, title=None),
+                    self.detail_data("premium", 30),
+                ],
+            )
+        detail.refresh_from_db()
+        self.assertEqual(detail.variant_price, Decimal("10.00"))
+        self.assertEqual(self.offer.details.count(), 1)
+
+    def test_bulk_writes_invalidate_cached_offers(self):
+        version = get_offer_cache_version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_or_update_details(self.offer, [self.detail_data("basic", 10)])
+            self.assertEqual(get_offer_cache_version(), version)
+        self.assertTrue(callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_offer_cache_version(), version)
+
+
+class ReviewCreateQueryTest(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.customer = User.objects.create_user(username="customer", password="pw")
+        CustomerProfile.objects.create(user=self.customer)
+        self.business_user = User.objects.create_user(username="business", password="pw")
+        BusinessProfile.objects.create(
+            user=self.business_user, company_name="Company", company_address="Street 1"
+        )
+        BusinessStats.objects.get_or_create(user=self.business_user)
+        token = Token.objects.create(user=self.customer)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def post_review(self, business_user_id):
+        return self.client.post(
+            "/api/reviews/",
+            {"business_user": business_user_id, "rating": 4, "description": "Good"},
+            format="json",
+        )
+
+    def test_create_skips_existence_checks(self):
+        self.client.get("/api/orders/")
+        with CaptureQueriesContext(connection) as context:
+            response = self.post_review(self.business_user.id)
+        self.assertEqual(response.status_code, 201)
+        selects = [
+            query["sql"] for query in context.captured_queries
+            if query["sql"].startswith("SELECT")
+        ]
+        self.assertFalse(any('"coder_app_review"' in sql.split("WHERE")[0] for sql in selects))
+        self.assertEqual(len([sql for sql in selects if 'FROM "auth_user"' in sql]), 1)
+
+    def test_duplicate_review_is_rejected(self):
+        self.assertEqual(self.post_review(self.business_user.id).status_code, 201)
+        response = self.post_review(self.business_user.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.data["detail"], "You have already reviewed this business user."
+        )
+        self.assertEqual(Review.objects.count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        error = IntegrityError("NOT NULL constraint failed: coder_app_review.rating")
+        with patch.object(Review, "save", side_effect=error):
+            response = self.post_review(self.business_user.id)
+        self.assertEqual(response.status_code, 500)
+        self.assertNotEqual(response.data.get("detail"), "You have already reviewed this business user.")
+
+    def test_non_business_target_is_rejected(self):
+        response = self.post_review(self.customer.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Review.objects.exists())
+
+
+class ReviewListPaginationTest(APITestCase):
+    def setUp(self):
+        get_token_cache().clear()
+        self.business_user = User.objects.create_user(username="business", password="pw")
+        BusinessProfile.objects.create(
+            user=self.business_user, company_name="Company", company_address="Street 1"
+        )
+        for index, rating in enumerate((3, 5, 1)):
+            reviewer = User.objects.create_user(username=f"reviewer{index}", password="pw")
+            Review.objects.create(
+                rating=rating,
+                description="Review",
+                business_user=self.business_user,
+                reviewer=reviewer,
+            )
+        token = Token.objects.create(user=self.business_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+
+    def get_reviews(self, **params):
+        return self.client.get(
+            "/api/reviews/", {"business_user_id": self.business_user.id, **params}
+        )
+
+    def test_unpaginated_by_default(self):
+        response = self.get_reviews()
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 3)
+
+    def test_page_size_paginates(self):
+        response = self.get_reviews(page_size=2, ordering="-rating")
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual([review["rating"] for review in response.data["results"]], [5, 3])
+        self.assertIsNotNone(response.data["next"])
+
+    def test_unknown_ordering_falls_back(self):
+        response = self.get_reviews(ordering="reviewer__password")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [review["id"] for review in response.data],
+            list(Review.objects.order_by("updated_at", "id").values_list("id", flat=True)),
+        )
+
+    def test_orderings_use_composite_indexes(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("Index names are checked in SQLite query plans.")
+        cases = (
+            ("business_user_id", "-updated_at", "review_business_updated_idx"),
+            ("business_user_id", "rating", "review_business_rating_idx"),
+            ("reviewer_id", "-updated_at", "review_reviewer_updated_idx"),
+        )
+        for param, ordering, index in cases:
+            reviews = get_filtered_reviews(
+                self.business_user, {param: self.business_user.id, "ordering": ordering}
+            )
+            self.assertIn(index, reviews.explain())
+
+
+class SqliteProductionProfileTest(TestCase):
+    @override_settings(SQLITE_TUNING={"BUSY_TIMEOUT": 1234, "CACHE_SIZE": -4000})
+    def test_pragmas_are_applied_to_new_connections(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("The profile only tunes SQLite connections.")
+        fresh = connections.create_connection("default")
+        try:
+            apply_sqlite_pragmas(sender=None, connection=fresh)
+            with fresh.cursor() as cursor:
+                cursor.execute("PRAGMA busy_timeout")
+                self.assertEqual(cursor.fetchone()[0], 1234)
+                cursor.execute("PRAGMA cache_size")
+                self.assertEqual(cursor.fetchone()[0], -4000)
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)
+        finally:
+            fresh.close()
+
+    def test_other_vendors_are_ignored(self):
+        other = MagicMock(vendor="postgresql")
+        apply_sqlite_pragmas(sender=None, connection=other)
+        other.cursor.assert_not_called()
+
+    def test_concurrency_benchmark_compares_profiles(self):
+        rows = sqlite_concurrency_scenario([50], 1, readers=2, writers=1)
+        self.assertEqual([row["profile"] for row in rows], ["default", "sqlite-production"])
+        self.assertTrue(all(row["errors"] == 0 for row in rows))
+
+
+class RequestMetricsMiddlewareTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        Offer.objects.create(user=self.user, title="Offer", description="D")
+
+    def test_header_is_hidden_by_default(self):
+        response = self.client.get("/api/offers/")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("Server-Timing", response)
+
+    def test_staff_user_receives_server_timing(self):
+        self.user.is_staff = True
+        self.user.save()
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/offers/")
+        timing = response["Server-Timing"]
+        self.assertIn(f'desc="{len(context.captured_queries)} queries"', timing)
+        self.assertIn("serializer;dur=", timing)
+        self.assertIn("view;dur=", timing)
+
+    @override_settings(REQUEST_METRICS={"DEBUG_TOKEN": "secret"})
+    def test_debug_token_unlocks_header(self):
+        response = self.client.get("/api/offers/", HTTP_X_DEBUG_TOKEN="wrong")
+        self.assertNotIn("Server-Timing", response)
+        response = self.client.get("/api/offers/", HTTP_X_DEBUG_TOKEN="secret")
+        self.assertIn("Server-Timing", response)
+
+    def test_lock_errors_are_logged_as_warnings(self):
+        def raise_locked(execute, sql, params, many, context):
+            raise OperationalError("database is locked")
+
+        def locked_statistics():
+            with connection.execute_wrapper(raise_locked):
+                return Offer.objects.count()
+
+        with patch("coder_app.views.collect_statistics", side_effect=locked_statistics):
+            with self.assertLogs("coder_app.requests", "WARNING") as logs:
+                response = self.client.get("/api/base-info/")
+        self.assertEqual(response.status_code, 500)
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual((entry["url_name"], entry["db_locked"]), ("base-info", 1))
+
+    def test_logs_one_line_per_request(self):
+        with self.assertLogs("coder_app.requests", "INFO") as logs:
+            self.client.get("/api/offers/")
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry["url_name"], "offers")
+        self.assertEqual(entry["status"], 200)
+        self.assertGreater(entry["queries"], 0)
+        self.assertGreater(entry["serializer_ms"], 0)
+
+
+class BenchmarkSuiteTest(TestCase):
+    def test_seed_is_deterministic(self):
+        call_command("seed_benchmark_data", businesses=3, customers=4, stdout=StringIO())
+        ratings = list(Review.objects.order_by("id").values_list("rating", flat=True))
+        self.assertEqual(Order.objects.values("status").distinct().count(), 4)
+        self.assertEqual(OfferDetail.objects.count(), 3 * 5 * 3)
+        self.assertEqual(SiteStatistics.objects.get().review_count, len(ratings))
+
+        call_command(
+            "seed_benchmark_data", businesses=3, customers=4, clear=True, stdout=StringIO()
+        )
+        self.assertEqual(
+            list(Review.objects.order_by("id").values_list("rating", flat=True)), ratings
+        )
+
+    def test_every_endpoint_answers(self):
+        seed_benchmark_data(businesses=2, customers=2)
+        results = run_endpoint_benchmarks(repeat=1)
+        self.assertEqual(len(results), 22)
+        for key, result in results.items():
+            self.assertLess(result["status"], 300, key)
+
+    def test_throttling_is_off_during_benchmarks(self):
+        seed_benchmark_data(businesses=2, customers=2)
+        with patch.dict(AnonRateThrottle.THROTTLE_RATES, {"anon": "2/day"}):
+            results = run_endpoint_benchmarks(repeat=5, only=["base-info"])
+        self.assertEqual(results["GET base-info (anonymous)"]["status"], 200)
+
+    def test_compare_flags_regressions(self):
+        baseline = {"GET offers": {"p95_ms": 10.0, "queries": 4}}
+        slower = {"GET offers": {"p95_ms": 13.0, "queries": 4}}
+        more_queries = {"GET offers": {"p95_ms": 10.0, "queries": 5}}
+        self.assertTrue(compare_with_baseline(slower, baseline)[0]["regression"])
+        self.assertTrue(compare_with_baseline(more_queries, baseline)[0]["regression"])
+        self.assertFalse(compare_with_baseline(baseline, baseline)[0]["regression"])
+
+
+class LoadTestHarnessTest(LiveServerTestCase):
+    @override_settings(PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+    def test_journeys_run_against_live_server(self):
+        seed_benchmark_data(businesses=2, customers=2)
+        # The live server shares one in-memory SQLite connection between its
+        # threads, so a single virtual user keeps the requests sequential.
+        summary = asyncio.run(
+            run_load_test(
+                self.live_server_url, get_journey_fixtures(), users=1, rate=0, duration=1
+            )
+        )
+        steps = {step["step"]: step for step in summary["steps"]}
+        self.assertEqual(steps["login"]["2xx"], 1)
+        self.assertGreater(steps["place order"]["2xx"], 0)
+        self.assertEqual(summary["error_rate"], 0.0)
+
+    def test_journeys_never_repeat_a_review(self):
+        seed_benchmark_data(businesses=2, customers=2)
+        fixtures = get_journey_fixtures()
+        username = fixtures["customers"][0]
+        already_reviewed = set(fixtures["reviewed"][username])
+        rng = random.Random(1)
+        targets = []
+        for _ in range(10):
+            steps = {step: data for step, _, _, data in build_journey(rng, fixtures, username)}
+            if "post review" in steps:
+                targets.append(steps["post review"]["business_user"])
+        self.assertEqual(len(targets), len(set(targets)))
+        self.assertFalse(already_reviewed & set(targets))
+        self.assertEqual(already_reviewed | set(targets), set(fixtures["businesses"]))
+
+    def test_unexpected_login_body_is_a_failed_login(self):
+        self.assertEqual(read_token(b'{"token": "abc"}'), "abc")
+        self.assertIsNone(read_token(b'{"detail": "ok"}'))
+        self.assertIsNone(read_token(b"<html>"))
+        self.assertIsNone(read_token(b"[]"))
+
+    def test_lock_errors_come_from_the_server_log(self):
+        report = LoadTestReport()
+        report.record("place order", 500, 5.0)
+        report.record("place order", 201, 3.0)
+        self.assertIsNone(report.summary(target_rate=10)["sqlite_lock_errors"])
+        report.add_server_log(
+            [
+                json.dumps({"url_name": "orders", "status": 500, "db_locked": 1}),
+                json.dumps({"url_name": "orders", "status": 201, "db_locked": 0}),
+                "[INFO] Booting worker with pid: 42",
+            ]
+        )
+        summary = report.summary(target_rate=10)
+        self.assertEqual(summary["sqlite_lock_errors"], 1)
+        self.assertEqual(summary["sqlite_lock_errors_by_view"], {"orders": 1})
+        self.assertEqual(summary["error_rate"], 0.5)
+
+
+class SlowQueryLogTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        get_token_cache().clear()
+        self.user = User.objects.create_user(username="seller", password="pw")
+        Offer.objects.create(user=self.user, title="Offer", description="D")
+        buffer_reset = patch("utils.slow_queries.slow_query_buffer", SlowQueryBuffer())
+        buffer_reset.start()
+        self.addCleanup(buffer_reset.stop)
+
+    def test_fingerprint_ignores_literals(self):
+        first = 'SELECT * FROM "t" WHERE "id" IN (%s, %s, %s) AND "name" = \'a\' LIMIT 21'
+        second = 'SELECT *  FROM "t" WHERE "id" IN (%s, %s) AND "name" = \'b\' LIMIT 6'
+        self.assertEqual(fingerprint_sql(first), fingerprint_sql(second))
+        self.assertNotEqual(fingerprint_sql(first), fingerprint_sql('SELECT * FROM "u"'))
+
+    @override_settings(SLOW_QUERY_LOG={"THRESHOLD_MS": 0, "RECORD_INTERVAL": 0})
+    def test_slow_queries_are_aggregated_with_plan(self):
+        self.client.get("/api/offers/", {"search": "offer"})
+        selects = SlowQuery.objects.filter(sql__startswith="SELECT")
+        recorded = selects.count()
+        self.assertGreater(recorded, 0)
+        self.assertEqual(set(selects.values_list("view_name", flat=True)), {"offers"})
+        if connection.vendor == "sqlite":
+            self.assertTrue(all(query.plan for query in selects))
+
+        # Only the LIMIT literal differs, so every query keeps its fingerprint.
+        self.client.get("/api/offers/", {"search": "offer", "page_size": 5})
+        self.assertEqual(selects.count(), recorded)
+        self.assertEqual(set(selects.values_list("count", flat=True)), {2})
+
+    @override_settings(SLOW_QUERY_LOG={"THRESHOLD_MS": 0, "RECORD_INTERVAL": 60})
+    def test_repeated_statements_are_written_once_per_interval(self):
+        self.client.get("/api/offers/", {"search": "offer"})
+        selects = SlowQuery.objects.filter(sql__startswith="SELECT")
+        self.assertEqual(set(selects.values_list("count", flat=True)), {1})
+
+        with CaptureQueriesContext(connection) as context:
+            self.client.get("/api/offers/", {"search": "offer", "page_size": 5})
+        self.assertFalse(
+            any("coder_app_slowquery" in query["sql"] for query in context.captured_queries)
+        )
+        flush_slow_queries(force=True)
+        self.assertEqual(set(selects.values_list("count", flat=True)), {2})
+
+    @override_settings(SLOW_QUERY_LOG={"THRESHOLD_MS": 0, "RECORD_INTERVAL": 0})
+    def test_params_are_not_stored_by_default(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/api/offers/", {"search": "offer"})
+        self.assertTrue(SlowQuery.objects.filter(sql__contains="authtoken_token").exists())
+        self.assertFalse(SlowQuery.objects.exclude(params="").exists())
+
+    @override_settings(
+        SLOW_QUERY_LOG={"THRESHOLD_MS": 0, "RECORD_INTERVAL": 0, "CAPTURE_PARAMS": True}
+    )
+    def test_token_lookups_never_store_params(self):
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.client.get("/api/offers/", {"search": "offer"})
+        self.assertTrue(SlowQuery.objects.exclude(params="").exists())
+        self.assertFalse(
+            SlowQuery.objects.filter(sql__contains="authtoken_token").exclude(params="").exists()
+        )
+        self.assertFalse(SlowQuery.objects.filter(params__contains=token.key).exists())
+
+    @override_settings(SLOW_QUERY_LOG={"THRESHOLD_MS": None})
+    def test_disabled_threshold_records_nothing(self):
+        self.client.get("/api/offers/")
+        self.assertFalse(SlowQuery.objects.exists())
+
+    def test_report_command_lists_queries(self):
+        SlowQuery.objects.create(
+            fingerprint="f" * 40,
+            sql='SELECT 1 FROM "coder_app_offer"',
+            view_name="offers",
+            plan="SCAN coder_app_offer",
+            count=3,
+            total_ms=900,
+            max_ms=500,
+        )
+        out = StringIO()
+        call_command("slow_query_report", plans=True, stdout=out)
+        self.assertIn("3x  total 900.0 ms", out.getvalue())
+        self.assertIn("SCAN coder_app_offer", out.getvalue())
+
+
+class MetricsEndpointTest(APITestCase):
+    def setUp(self):
+        get_response_cache().clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.suite_metrics = settings.METRICS
+        settings_override = override_settings(
+            METRICS={"DIRECTORY": self.directory, "FLUSH_INTERVAL": 0, "TOKEN": None}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_suite_writes_to_its_own_directory(self):
+        self.assertIn("coderr-test-metrics-", self.suite_metrics["DIRECTORY"])
+        self.assertEqual(str(get_metrics_store().directory), self.directory)
+
+    def test_store_writes_nothing_without_directory(self):
+        with self.settings(METRICS={"DIRECTORY": None, "TOKEN": None}):
+            self.client.get("/api/offers/")
+            store = get_metrics_store()
+            store.safe_flush()
+            body = self.client.get("/metrics").content.decode()
+        self.assertIsNone(store.directory)
+        self.assertIn('coderr_http_requests_total{method="GET",status="200",view="offers"} 1', body)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_requests_are_counted_per_url_name(self):
+        self.client.get("/api/offers/")
+        self.client.get("/api/offers/")
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn(
+            'coderr_http_requests_total{method="GET",status="200",view="offers"} 2', body
+        )
+        self.assertIn('coderr_http_request_duration_seconds_count{view="offers"} 2', body)
+        self.assertIn('coderr_http_request_duration_seconds_bucket{view="offers",le="+Inf"} 2', body)
+        self.assertIn('coderr_db_queries_total{view="offers"}', body)
+        self.assertIn('coderr_cache_hit_ratio{cache="response"} 0.5', body)
+        self.assertIn("# TYPE coderr_http_request_duration_seconds histogram", body)
+
+    def test_unknown_methods_share_one_series(self):
+        self.client.generic("PURGE", "/api/offers/")
+        self.client.generic("X-CUSTOM", "/api/offers/")
+        body = self.client.get("/metrics").content.decode()
+        self.assertIn('method="other"', body)
+        self.assertNotIn("PURGE", body)
+        self.assertNotIn("X-CUSTOM", body)
+
+    def test_unwritable_directory_still_serves_metrics(self):
+        with patch("utils.metrics.MetricsStore.flush", side_effect=OSError("No space left")):
+            response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+
+    def test_worker_files_are_summed(self):
+        live = MetricsStore(self.directory)
+        live.inc("coderr_http_requests_total", view="offers", method="GET", status="200")
+        live.observe("coderr_http_request_duration_seconds", 0.02, view="offers")
+        live.flush()
+        exited = MetricsStore(self.directory)
+        exited.pid = 2**22 + 1
+        exited.inc("coderr_http_requests_total", 2, view="offers", method="GET", status="200")
+        exited.observe("coderr_http_request_duration_seconds", 3, view="offers")
+        exited.flush()
+
+        counters, histograms, memory = collect_metrics(self.directory)
+        body = render_metrics(counters, histograms, memory)
+        self.assertIn('coderr_http_requests_total{method="GET",status="200",view="offers"} 3', body)
+        self.assertIn('coderr_http_request_duration_seconds_bucket{view="offers",le="0.025"} 1', body)
+        self.assertIn('coderr_http_request_duration_seconds_bucket{view="offers",le="5.0"} 2', body)
+        self.assertEqual(list(memory), [live.pid])
+
+    def test_token_is_required_when_configured(self):
+        with self.settings(METRICS={"DIRECTORY": self.directory, "TOKEN": "scrape"}):
+            self.assertEqual(self.client.get("/metrics").status_code, 403)
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    def test_proxied_requests_are_refused_without_token(self):
+        response = self.client.get("/metrics", HTTP_X_FORWARDED_FOR="203.0.113.7")
+        self.assertEqual(response.status_code, 403)
+        response = self.client.get("/metrics", REMOTE_ADDR="203.0.113.7")
+        self.assertEqual(response.status_code, 403)
+
 
 class BusinessProfileSerializerTest(APITestCase):
     def setUp(self):
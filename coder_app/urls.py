@@ -36,6 +36,12 @@ urlpatterns = [
         views.OrderCountView.as_view(),
         name="order-count",
     ),
+    path("order-stats/", views.OrderStatsView.as_view(), name="order-stats"),
+    path(
+        "order-stats/<int:business_user_id>/",
+        views.OrderStatsView.as_view(),
+        name="order-stats-detail",
+    ),
     path(
         "completed-order-count/<int:business_user_id>/",
         views.CompletedOrderCountView.as_view(),
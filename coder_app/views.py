@@ -1,4 +1,5 @@
-from django.db.models import Min
+from django.db.models import F, Prefetch
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status
@@ -15,7 +16,7 @@ from rest_framework.permissions import (
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from coder_app.filters import OfferFilter
+from coder_app.filters import OfferFilter, OrderFilter
 from coder_app.models import (
     BusinessProfile,
     CustomerProfile,
@@ -42,27 +43,29 @@ from utils.functions import (
     create_or_update_details,
     create_order,
     create_review,
-    fetch_business_user_by_id,
     format_common_profile_data,
     format_profile_response,
-    get_business_user,
     get_customer_profile_or_error,
     get_filtered_reviews,
     get_offer_detail,
     get_offer_or_404,
-    get_order_count,
+    get_order_stats,
     get_orders_for_user,
     get_user_and_profile,
     get_user_or_error,
     handle_exception,
-    has_existing_review,
     is_business_user,
     is_customer,
+    is_pagination_requested,
+    save_review,
+    parse_business_user_ids,
     update_order_status,
     apply_ordering,
     validate_details,
     create_offer_response,
     get_paginated_response,
+    get_profile_list_queryset,
+    list_profiles,
     check_user_and_profile,
     check_permissions,
     handle_generic_error,
@@ -72,10 +75,31 @@ from utils.functions import (
     update_user_data,
     get_review_or_404,
     CustomPagination,
+    OfferCursorPagination,
+    OrderCursorPagination,
+    stream_json_array,
+)
+from utils.cache import (
+    build_validators,
+    conditional_response,
+    get_cached_response,
+    get_queryset_validators,
+)
+from utils.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    collect_store_metrics,
+    get_metrics_options,
+    get_metrics_store,
+    is_metrics_request_allowed,
+    render_metrics,
 )
 from utils.utils import authenticate_user, create_token_for_user
 
 
+# Offer responses embed the owner's names; renames touch the profile.
+OFFER_OWNER_UPDATED = ("user__business_profile__updated_at",)
+
+
 class IsOwnerOrAdmin(BasePermission):
     """
     Allows access to admins or the object's owner.
@@ -93,7 +117,7 @@ class IsBusinessProfile(BasePermission):
     """
 
     def has_permission(self, request, view):
-        return hasattr(request.user, "business_profile")
+        return is_business_user(request.user)
 
 
 class OfferListView(APIView):
@@ -111,17 +135,29 @@ class OfferListView(APIView):
         """
         Returns the base QuerySet with annotations for minimum price and delivery time.
 
+        The minimums are read from the denormalized offer columns instead of
+        aggregating over the details. The owner is joined and the details are
+        prefetched once per page, so serializing an offer never hits the
+        database again.
+
         Returns:
             QuerySet: Annotated queryset for offers.
         """
-        return Offer.objects.annotate(
-            min_price=Min("details__variant_price"),
-            min_delivery_time=Min("details__delivery_time_in_days"),
+        return (
+            Offer.objects.annotate(
+                min_price=F("price"),
+                min_delivery_time=F("delivery_time_in_days"),
+            )
+            .select_related("user")
+            .prefetch_related(
+                Prefetch("details", queryset=OfferDetail.objects.order_by("id"))
+            )
         )
 
     def get(self, request, *args, **kwargs):
         """
         Handles GET requests to retrieve and filter offers.
+        Anonymous requests are served from the response cache.
 
         Args:
             request (HttpRequest): The incoming request.
@@ -129,17 +165,42 @@ class OfferListView(APIView):
         Returns:
             Response: Paginated and serialized offers.
         """
+        return get_cached_response(
+            request, "offer-list", lambda: self.list_offers(request)
+        )
+
+    def list_offers(self, request):
+        """
+        Filters, orders and paginates the offers.
+
+        Passing ``cursor`` (empty for the first page) switches to keyset
+        pagination, which skips the total count and therefore the
+        conditional GET validators as well.
+        """
         queryset = self.get_queryset()
         filterset = OfferFilter(request.query_params, queryset=queryset)
 
         if not filterset.is_valid():
             return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
 
+        default_ordering = (
+            "relevance" if request.query_params.get("search") else "-updated_at"
+        )
         queryset = apply_ordering(
-            filterset.qs, request.query_params.get("ordering", "-updated_at")
+            filterset.qs, request.query_params.get("ordering", default_ordering)
         )
-        return get_paginated_response(
-            queryset, request, OfferSerializer, CustomPagination
+        if "cursor" in request.query_params:
+            return get_paginated_response(
+                queryset, request, OfferSerializer, OfferCursorPagination
+            )
+        return conditional_response(
+            request,
+            lambda: get_queryset_validators(
+                filterset.qs, request.GET.urlencode(), related=OFFER_OWNER_UPDATED
+            ),
+            lambda: get_paginated_response(
+                queryset, request, OfferSerializer, CustomPagination
+            ),
         )
 
     def post(self, request, *args, **kwargs):
@@ -152,7 +213,7 @@ class OfferListView(APIView):
         Returns:
             Response: The created offer data or detail message.
         """
-        if not hasattr(request.user, "business_profile"):
+        if not is_business_user(request.user):
             return Response(
                 {"detail": "Only business users can create offers."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -184,9 +245,16 @@ class OfferDetailView(APIView):
         Retrieves the details of a specific offer.
         """
         offer = get_offer_or_404(id)
-        
-        serializer = OfferSerializer(offer, context={"request": request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return conditional_response(
+            request,
+            lambda: get_queryset_validators(
+                Offer.objects.filter(pk=offer.pk), related=OFFER_OWNER_UPDATED
+            ),
+            lambda: Response(
+                OfferSerializer(offer, context={"request": request}).data,
+                status=status.HTTP_200_OK,
+            ),
+        )
     
     def patch(self, request, id, format=None):
         """
@@ -249,6 +317,18 @@ class OfferDetailRetrieveView(RetrieveAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = "id"
 
+    def retrieve(self, request, *args, **kwargs):
+        """
+        Serves anonymous requests from the response cache.
+        """
+        return get_cached_response(
+            request,
+            "offer-detail",
+            lambda: super(OfferDetailRetrieveView, self).retrieve(
+                request, *args, **kwargs
+            ),
+        )
+
 
 class RegistrationView(APIView):
     permission_classes = [AllowAny]
@@ -318,19 +398,22 @@ class BusinessProfileListView(APIView):
         Returns a list of all business profiles on the platform in the required format.
         """
         try:
-            profiles = BusinessProfile.objects.all()
-            response_data = [
-                self.format_profile_data(profile, request) for profile in profiles
-            ]
-            return Response(response_data, status=status.HTTP_200_OK)
+            profiles = get_profile_list_queryset(
+                BusinessProfile, "location", "tel", "description", "working_hours"
+            )
+            return conditional_response(
+                request,
+                lambda: get_queryset_validators(profiles, request.GET.urlencode()),
+                lambda: list_profiles(request, profiles, self.format_profile_data),
+            )
         except Exception as e:
             return handle_exception(e)
 
-    def format_profile_data(self, profile, request):
+    def format_profile_data(self, profile, media_prefix):
         """
         Formats the data for a single business profile.
         """
-        data = format_common_profile_data(profile, request)
+        data = format_common_profile_data(profile, media_prefix=media_prefix)
         data.update(
             {
                 "location": profile.location or None,
@@ -351,19 +434,20 @@ class CustomerProfileListView(APIView):
         Returns a list of all customer profiles on the platform.
         """
         try:
-            profiles = CustomerProfile.objects.all()
-            response_data = [
-                self.format_profile_data(profile, request) for profile in profiles
-            ]
-            return Response(response_data, status=status.HTTP_200_OK)
+            profiles = get_profile_list_queryset(CustomerProfile, "created_at")
+            return conditional_response(
+                request,
+                lambda: get_queryset_validators(profiles, request.GET.urlencode()),
+                lambda: list_profiles(request, profiles, self.format_profile_data),
+            )
         except Exception as e:
             return handle_exception(e)
 
-    def format_profile_data(self, profile, request):
+    def format_profile_data(self, profile, media_prefix):
         """
         Formats the data for a single customer profile.
         """
-        data = format_common_profile_data(profile, request)
+        data = format_common_profile_data(profile, media_prefix=media_prefix)
         data.update(
             {
                 "uploaded_at": profile.created_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
@@ -386,8 +470,14 @@ class ProfileView(APIView):
         if response:
             return response
 
-        response_data = format_profile_response(user, profile, profile_type)
-        return Response(response_data, status=status.HTTP_200_OK)
+        return conditional_response(
+            request,
+            lambda: build_validators(profile.updated_at, user.id, profile_type),
+            lambda: Response(
+                format_profile_response(user, profile, profile_type),
+                status=status.HTTP_200_OK,
+            ),
+        )
 
     def patch(self, request, pk, format=None):
         """
@@ -430,8 +520,14 @@ class BusinessProfileView(APIView):
         if response:
             return response
 
-        response_data = format_profile_response(user, profile, profile_type)
-        return Response(response_data, status=status.HTTP_200_OK)
+        return conditional_response(
+            request,
+            lambda: build_validators(profile.updated_at, user.id, profile_type),
+            lambda: Response(
+                format_profile_response(user, profile, profile_type),
+                status=status.HTTP_200_OK,
+            ),
+        )
 
     def patch(self, request, pk, format=None):
         """
@@ -479,8 +575,14 @@ class CustomerProfileView(APIView):
         if isinstance(customer_profile, Response):
             return customer_profile
 
-        serializer = CustomerProfileSerializer(user.customer_profile)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return conditional_response(
+            request,
+            lambda: build_validators(customer_profile.updated_at, user.id),
+            lambda: Response(
+                CustomerProfileSerializer(customer_profile).data,
+                status=status.HTTP_200_OK,
+            ),
+        )
 
     def patch(self, request, pk, format=None):
         """
@@ -504,6 +606,10 @@ class CustomerProfileView(APIView):
 
 
 class ReviewPagination(PageNumberPagination):
+    """
+    Opt-in pagination for the review list (``?page=`` or ``?page_size=``).
+    """
+
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 50
@@ -520,10 +626,26 @@ class ReviewListCreateView(APIView):
     def get(self, request):
         """
         Handles GET requests to retrieve reviews.
+        Sending ``page`` or ``page_size`` returns one page of them.
         """
         reviews = get_filtered_reviews(request.user, request.query_params)
-        serializer = ReviewSerializer(reviews, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+
+        def build_response():
+            if is_pagination_requested(request):
+                return get_paginated_response(
+                    reviews, request, ReviewSerializer, ReviewPagination
+                )
+            return Response(
+                ReviewSerializer(reviews, many=True).data, status=status.HTTP_200_OK
+            )
+
+        return conditional_response(
+            request,
+            lambda: get_queryset_validators(
+                reviews, request.user.id, request.GET.urlencode()
+            ),
+            build_response,
+        )
 
     def post(self, request):
         """
@@ -535,23 +657,12 @@ class ReviewListCreateView(APIView):
                 status=status.HTTP_403_FORBIDDEN,
             )
 
-        try:
-            business_user = get_business_user(request.data)
-            if not is_business_user(business_user):
-                return Response(
-                    {"detail": "The specified user is not a business user."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
+        serializer = ReviewSerializer(data=request.data, context={"request": request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-            if has_existing_review(request.user, business_user):
-                return Response(
-                    {"detail": "You have already reviewed this business user."},
-                    status=status.HTTP_400_BAD_REQUEST,
-                )
-                
-            review_data, status_code = create_review(
-                request.data, request.user, business_user, {"request": request}
-            )
+        try:
+            review_data, status_code = create_review(serializer, request.user)
             return Response(review_data, status=status_code)
         except Exception as e:
             return handle_exception(e)
@@ -585,8 +696,8 @@ class ReviewDetailView(APIView):
 
         serializer = ReviewSerializer(review, data=request.data, partial=True, context={"request": request})
         if serializer.is_valid():
-            serializer.save()
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            review_data, status_code = save_review(serializer)
+            return Response(review_data, status=status_code)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def delete(self, request, id):
@@ -633,9 +744,28 @@ class OrderListView(APIView):
     def get(self, request):
         """
         Retrieves orders for the authenticated user.
+
+        Supports ``status``, ``created_after`` and ``created_before`` filters.
+        Passing ``cursor`` switches to keyset pagination on (created_at, id);
+        ``stream=true`` streams the full history as a JSON array for exports.
         """
+        filterset = OrderFilter(
+            request.query_params, queryset=get_orders_for_user(request.user)
+        )
+        if not filterset.is_valid():
+            return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+        orders = filterset.qs
+
+        if request.query_params.get("stream") in ("1", "true"):
+            return StreamingHttpResponse(
+                stream_json_array(orders.order_by("-created_at", "-id"), OrderSerializer),
+                content_type="application/json",
+            )
+        if "cursor" in request.query_params:
+            return get_paginated_response(
+                orders, request, OrderSerializer, OrderCursorPagination
+            )
         try:
-            orders = get_orders_for_user(request.user)
             serializer = OrderSerializer(orders, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         except Exception as e:
@@ -645,7 +775,7 @@ class OrderListView(APIView):
         """
         Creates a new order for a given offer detail.
         """
-        if not hasattr(request.user, "customer_profile"):
+        if not is_customer(request.user):
             return Response(
                 {"detail": "Only customers can create orders."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -679,7 +809,7 @@ class OrderDetailView(APIView):
         """
         Updates the status of a specific order.
         """
-        if not hasattr(request.user, "business_profile"):
+        if not is_business_user(request.user):
             return Response(
                 {"detail": "Only business can update orders."},
                 status=status.HTTP_403_FORBIDDEN,
@@ -715,35 +845,56 @@ class OrderDetailView(APIView):
             )
 
 
-class OrderCountView(APIView):
+class OrderStatsView(APIView):
     """
-    Retrieves the count of in-progress orders for a specific business user.
+    Returns the order count per status for one business user, or for many
+    at once via ``?business_user_ids=1,2,3``.
     """
 
-    def get(self, request, business_user_id):
-        business_user = fetch_business_user_by_id(business_user_id)
-        if not business_user:
+    def get(self, request, business_user_id=None):
+        if business_user_id is None:
+            business_user_ids = parse_business_user_ids(
+                request.query_params.get("business_user_ids", "")
+            )
+            return Response(get_order_stats(business_user_ids), status=status.HTTP_200_OK)
+
+        order_stats = get_order_stats([business_user_id]).get(business_user_id)
+        if order_stats is None:
             return Response(
                 {"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND
             )
+        return Response(self.format_stats(order_stats), status=status.HTTP_200_OK)
+
+    def format_stats(self, order_stats):
+        return order_stats
+
+
+class OrderCountView(OrderStatsView):
+    """
+    Retrieves the count of in-progress orders for a specific business user.
+    """
 
-        order_count = get_order_count(business_user, "in_progress")
-        return Response({"order_count": order_count}, status=status.HTTP_200_OK)
+    def format_stats(self, order_stats):
+        return {"order_count": order_stats["in_progress"]}
 
 
-class CompletedOrderCountView(APIView):
+class CompletedOrderCountView(OrderStatsView):
     """
     Retrieves the count of completed orders for a specific business user.
     """
 
-    def get(self, request, business_user_id):
-        business_user = fetch_business_user_by_id(business_user_id)
-        if not business_user:
-            return Response(
-                {"error": "Business user not found."}, status=status.HTTP_404_NOT_FOUND
-            )
+    def format_stats(self, order_stats):
+        return {"completed_order_count": order_stats["completed"]}
 
-        completed_order_count = get_order_count(business_user, "completed")
-        return Response(
-            {"completed_order_count": completed_order_count}, status=status.HTTP_200_OK
-        )
+
+def metrics_view(request):
+    """
+    Serves request, database, cache and worker metrics of all gunicorn
+    workers in the Prometheus text format. Plain Django view, so scrapes
+    are neither authenticated nor throttled by DRF.
+    """
+    options = get_metrics_options()
+    if not is_metrics_request_allowed(request, options["token"]):
+        return HttpResponseForbidden()
+    body = render_metrics(*collect_store_metrics(get_metrics_store()))
+    return HttpResponse(body, content_type=METRICS_CONTENT_TYPE)
@@ -0,0 +1,175 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from utils.metrics import record_cache_lookup
+from utils.utils import resolve_profiles
+
+
+# tokenCache_logic.py
+TOKEN_CACHE_KEY = "auth:token:{key}"
+
+
+class TokenCache:
+    """
+    Bounded LRU of token key -> (user, token) entries with a TTL.
+
+    Entries can additionally be shared through a Django cache alias, so a
+    worker that missed locally still skips the database.
+    """
+
+    def __init__(self, max_size=1024, ttl=60, alias=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.alias = alias
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {"hits": 0, "shared_hits": 0, "misses": 0}
+
+    @classmethod
+    def from_settings(cls):
+        options = getattr(settings, "TOKEN_AUTH_CACHE", {})
+        return cls(
+            max_size=options.get("MAX_SIZE", 1024),
+            ttl=options.get("TTL", 60),
+            alias=options.get("CACHE_ALIAS"),
+        )
+
+    @property
+    def shared(self):
+        return caches[self.alias] if self.alias else None
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.counters["hits"] += 1
+                record_cache_lookup("token", hit=True)
+                return entry[1]
+            self.entries.pop(key, None)
+
+        cached = self.shared.get(TOKEN_CACHE_KEY.format(key=key)) if self.shared else None
+        with self.lock:
+            if cached is None:
+                self.counters["misses"] += 1
+                record_cache_lookup("token", hit=False)
+                return None
+            self.counters["shared_hits"] += 1
+            record_cache_lookup("token", hit=True)
+        self.store_locally(key, cached)
+        return cached
+
+    def set(self, key, user, token):
+        user._state.fields_cache = {}
+        value = (user, token)
+        self.store_locally(key, value)
+        if self.shared:
+            self.shared.set(TOKEN_CACHE_KEY.format(key=key), value, self.ttl)
+
+    def store_locally(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, *keys):
+        with self.lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        if self.shared and keys:
+            self.shared.delete_many([TOKEN_CACHE_KEY.format(key=key) for key in keys])
+
+    def invalidate_user(self, user_id):
+        """
+        Drops every cached token of the user. Shared entries are looked up
+        by the user's token keys, local ones by scanning the bounded LRU.
+        """
+        with self.lock:
+            keys = [
+                key
+                for key, (_, (user, _token)) in self.entries.items()
+                if user.pk == user_id
+            ]
+        if self.shared:
+            keys.extend(Token.objects.filter(user_id=user_id).values_list("key", flat=True))
+        self.invalidate(*keys)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def stats(self):
+        with self.lock:
+            hits = self.counters["hits"] + self.counters["shared_hits"]
+            lookups = hits + self.counters["misses"]
+            return {
+                **self.counters,
+                "size": len(self.entries),
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_token_cache = None
+
+
+def get_token_cache():
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache.from_settings()
+    return _token_cache
+
+
+def invalidate_token(sender, instance, **kwargs):
+    """
+    Signal receiver: forgets a deleted token.
+    """
+    get_token_cache().invalidate(instance.key)
+
+
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """
+    Signal receiver: forgets every token of a changed or deleted user, so
+    deactivation and permission changes apply immediately.
+    """
+    get_token_cache().invalidate_user(instance.pk)
+
+
+def forget_profile_types(sender, instance, created=True, **kwargs):
+    """
+    Signal receiver: a created or deleted profile changes the user's
+    profile types, which cached users carry along.
+    """
+    if created:
+        get_token_cache().invalidate_user(instance.user_id)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication that serves repeated lookups from the token cache.
+    Each request receives its own copy of the cached user, including its
+    resolved profile types.
+    """
+
+    def authenticate_credentials(self, key):
+        token_cache = get_token_cache()
+        cached = token_cache.get(key)
+        if cached is None:
+            user, token = super().authenticate_credentials(key)
+            resolve_profiles(user)
+            token_cache.set(key, user, token)
+        else:
+            user, token = cached
+        return copy.copy(user), token
+
+
+# End of tokenCache_logic.py
@@ -0,0 +1,708 @@
+import hashlib
+import random
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Q
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.views import APIView
+
+from coder_app.models import (
+    BusinessProfile,
+    CustomerProfile,
+    Offer,
+    OfferDetail,
+    Order,
+    Review,
+)
+from utils.cache import bump_offer_cache_version
+from utils.database import get_sqlite_pragmas
+from utils.functions import (
+    REVIEW_ORDERINGS,
+    apply_ordering,
+    get_filtered_reviews,
+    reconcile_site_statistics,
+)
+from utils.utils import reconcile_business_stats, snapshot_offer_detail
+from utils.search import get_search_backend, search_offers
+
+
+# benchmark_logic.py
+WORDS = (
+    "logo design website landing page react django python api backend "
+    "frontend mobile app android ios illustration branding video editing "
+    "animation seo marketing copywriting translation voice over podcast "
+    "data analysis excel dashboard wordpress shop plugin consulting audit"
+).split()
+
+
+def measure(function, repeat):
+    """
+    Runs the function repeatedly and returns p50/p95/max latency in ms.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return summarize_timings(timings)
+
+
+def summarize_timings(timings):
+    timings = sorted(timings)
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+def build_vocabulary(rng, size=5000):
+    """
+    Mixes real service words with random filler so terms stay selective.
+    """
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    filler = [
+        "".join(rng.choice(letters) for _ in range(rng.randint(3, 9)))
+        for _ in range(size)
+    ]
+    return list(WORDS) + filler
+
+
+def random_text(rng, vocabulary, length):
+    return " ".join(rng.choice(vocabulary) for _ in range(length))
+
+
+def create_benchmark_offers(count, seed=0, batch_size=2000):
+    """
+    Bulk-inserts synthetic offers owned by a throwaway user.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng)
+    user = User.objects.create(username=f"benchmark-{seed}-{time.time_ns()}")
+    for start in range(0, count, batch_size):
+        Offer.objects.bulk_create(
+            Offer(
+                title=random_text(rng, vocabulary, 4),
+                description=random_text(rng, vocabulary, 40),
+                user=user,
+            )
+            for _ in range(min(batch_size, count - start))
+        )
+    return user
+
+
+def run_in_rollback(function):
+    """
+    Runs the function inside a transaction that is always rolled back,
+    so benchmark data never reaches the real database.
+    """
+    result = None
+    with transaction.atomic():
+        result = function()
+        transaction.set_rollback(True)
+    return result
+
+
+def offer_search_scenario(sizes, repeat, terms=("react", "logo des", "pod")):
+    """
+    Compares icontains scans with the full-text index for growing offer tables.
+    """
+    backend = get_search_backend(connection.alias) or "icontains"
+    rows = []
+    for size in sizes:
+
+        def run():
+            create_benchmark_offers(size)
+            for term in terms:
+                methods = (
+                    (
+                        "icontains",
+                        Offer.objects.filter(
+                            Q(title__icontains=term) | Q(description__icontains=term)
+                        ).order_by("-updated_at"),
+                    ),
+                    (
+                        backend,
+                        apply_ordering(
+                            search_offers(Offer.objects.all(), term), "relevance"
+                        ),
+                    ),
+                )
+                for label, page in methods:
+                    stats = measure(lambda: (page.count(), list(page[:6])), repeat)
+                    rows.append(
+                        {"offers": size, "term": term, "method": label, **stats}
+                    )
+
+        run_in_rollback(run)
+    return rows
+
+
+def create_benchmark_reviews(count, seed=0, business_users=50, batch_size=2000):
+    """
+    Bulk-inserts synthetic reviews spread over a few business users. Each
+    reviewer reviews every business user once, as the unique constraint
+    demands. Returns the business users and reviewers.
+    """
+    rng = random.Random(seed)
+    prefix = f"benchmark-{seed}-{time.time_ns()}"
+    businesses = User.objects.bulk_create(
+        User(username=f"{prefix}-business-{index}") for index in range(business_users)
+    )
+    reviewers = User.objects.bulk_create(
+        User(username=f"{prefix}-reviewer-{index}")
+        for index in range(-(-count // business_users))
+    )
+    for start in range(0, count, batch_size):
+        Review.objects.bulk_create(
+            Review(
+                rating=rng.randint(1, 5),
+                description="Benchmark review",
+                business_user=businesses[index % business_users],
+                reviewer=reviewers[index // business_users],
+            )
+            for index in range(start, min(start + batch_size, count))
+        )
+    return businesses, reviewers
+
+
+def get_used_index(queryset):
+    """
+    Returns the name of the first index from the query plan, if any.
+    """
+    plan = queryset.explain()
+    for index in Review._meta.indexes:
+        if index.name in plan:
+            return index.name
+    return "-"
+
+
+def review_list_scenario(sizes, repeat):
+    """
+    Measures the first review page of one business user and one reviewer
+    for every supported ordering while the review table grows.
+    """
+    rows = []
+    for size in sizes:
+
+        def run():
+            businesses, reviewers = create_benchmark_reviews(size)
+            filters = (
+                ("business_user", businesses[0], {"business_user_id": businesses[0].id}),
+                ("reviewer", reviewers[0], {"reviewer_id": reviewers[0].id}),
+            )
+            for label, user, params in filters:
+                for ordering in REVIEW_ORDERINGS:
+                    page = get_filtered_reviews(user, {**params, "ordering": ordering})
+                    stats = measure(lambda: list(page[:10]), repeat)
+                    rows.append(
+                        {
+                            "reviews": size,
+                            "filter": label,
+                            "ordering": ordering,
+                            "index": get_used_index(page[:10]),
+                            **stats,
+                        }
+                    )
+
+        run_in_rollback(run)
+    return rows
+
+
+SQLITE_PROFILES = (
+    ("default", lambda: {}, False, None),
+    ("sqlite-production", get_sqlite_pragmas, True, "IMMEDIATE"),
+)
+
+
+class SqliteWorkload:
+    """
+    One reader/writer mix against a database file. Without persistent
+    connections every operation opens the file again, like a request with
+    CONN_MAX_AGE=0.
+    """
+
+    def __init__(self, path, pragmas, persistent, begin):
+        self.path = path
+        self.pragmas = pragmas
+        self.persistent = persistent
+        self.begin = f"BEGIN {begin}" if begin else "BEGIN"
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.read_timings = []
+        self.errors = 0
+
+    def connect(self):
+        if self.persistent and getattr(self.local, "connection", None):
+            return self.local.connection
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        for pragma, value in self.pragmas.items():
+            connection.execute(f"PRAGMA {pragma} = {value}")
+        if self.persistent:
+            self.local.connection = connection
+        return connection
+
+    def release(self, connection):
+        if not self.persistent:
+            connection.close()
+
+    def read(self, rng, rows):
+        start = time.perf_counter()
+        connection = self.connect()
+        try:
+            connection.execute(
+                "SELECT value FROM item WHERE id = ?", (rng.randint(1, rows),)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            with self.lock:
+                self.errors += 1
+            return
+        finally:
+            self.release(connection)
+        with self.lock:
+            self.read_timings.append((time.perf_counter() - start) * 1000)
+
+    def write(self, rng, rows):
+        connection = self.connect()
+        try:
+            connection.execute(self.begin)
+            connection.execute(
+                "UPDATE item SET value = ? WHERE id = ?",
+                (str(rng.random()), rng.randint(1, rows)),
+            )
+            connection.execute("COMMIT")
+        except sqlite3.OperationalError:
+            if connection.in_transaction:
+                connection.execute("ROLLBACK")
+            with self.lock:
+                self.errors += 1
+        finally:
+            self.release(connection)
+
+
+def create_sqlite_database(path, rows):
+    with sqlite3.connect(path) as connection:
+        connection.execute("CREATE TABLE item (id INTEGER PRIMARY KEY, value TEXT)")
+        connection.executemany(
+            "INSERT INTO item (id, value) VALUES (?, ?)",
+            ((index, "x" * 64) for index in range(1, rows + 1)),
+        )
+    connection.close()
+
+
+def run_sqlite_workload(workload, rows, operations, readers=4, writers=2):
+    """
+    Runs reader and writer threads in parallel and returns the elapsed time.
+    """
+
+    def worker(seed, action):
+        rng = random.Random(seed)
+        for _ in range(operations):
+            action(rng, rows)
+
+    threads = [
+        threading.Thread(target=worker, args=(index, workload.read))
+        for index in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=(readers + index, workload.write))
+        for index in range(writers)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, readers * operations, writers * operations
+
+
+def sqlite_concurrency_scenario(sizes, repeat, readers=4, writers=2):
+    """
+    Compares the default SQLite settings with the sqlite-production profile
+    under concurrent reads and writes. Runs on a temporary database file;
+    ``repeat`` is multiplied by 50 to get the operations per thread.
+    """
+    rows = []
+    operations = repeat * 50
+    for size in sizes:
+        for profile, get_pragmas, persistent, begin in SQLITE_PROFILES:
+            with tempfile.TemporaryDirectory() as directory:
+                path = str(Path(directory) / "benchmark.sqlite3")
+                create_sqlite_database(path, size)
+                workload = SqliteWorkload(path, get_pragmas(), persistent, begin)
+                elapsed, reads, writes = run_sqlite_workload(
+                    workload, size, operations, readers, writers
+                )
+            timings = sorted(workload.read_timings) or [0.0]
+            rows.append(
+                {
+                    "rows": size,
+                    "profile": profile,
+                    "reads_per_s": round(reads / elapsed),
+                    "writes_per_s": round(writes / elapsed),
+                    "read_p95_ms": round(timings[max(0, int(len(timings) * 0.95) - 1)], 3),
+                    "errors": workload.errors,
+                }
+            )
+    return rows
+
+
+SCENARIOS = {
+    "offer-search": offer_search_scenario,
+    "review-list": review_list_scenario,
+    "sqlite-concurrency": sqlite_concurrency_scenario,
+}
+
+
+# End of benchmark_logic.py
+
+
+# benchmarkData_logic.py
+BENCHMARK_PREFIX = "bench-"
+BENCHMARK_PASSWORD = "benchmark-password"
+OFFER_TIERS = (("basic", 1), ("standard", 2), ("premium", 3))
+ORDER_STATUSES = [status for status, _ in Order.STATUS_CHOICES]
+
+
+def benchmark_username(role, index):
+    return f"{BENCHMARK_PREFIX}{role}-{index}"
+
+
+def benchmark_token(seed, username):
+    """
+    Derives a stable token key, so runs against the same seed reuse tokens.
+    """
+    return hashlib.sha1(f"{seed}:{username}".encode()).hexdigest()
+
+
+def has_benchmark_data():
+    return User.objects.filter(username__startswith=BENCHMARK_PREFIX).exists()
+
+
+def clear_benchmark_data():
+    """
+    Deletes every generated user together with their cascaded rows.
+    """
+    deleted, _ = User.objects.filter(username__startswith=BENCHMARK_PREFIX).delete()
+    reconcile_site_statistics()
+    bump_offer_cache_version()
+    return deleted
+
+
+def create_benchmark_users(role, count, seed, password):
+    users = User.objects.bulk_create(
+        User(
+            username=benchmark_username(role, index),
+            email=f"{benchmark_username(role, index)}@example.com",
+            password=password,
+        )
+        for index in range(count)
+    )
+    Token.objects.bulk_create(
+        Token(key=benchmark_token(seed, user.username), user=user) for user in users
+    )
+    return users
+
+
+def build_offer_details(rng, offer, vocabulary):
+    base_price = rng.randint(10, 200)
+    base_delivery = rng.randint(1, 10)
+    return [
+        OfferDetail(
+            offer=offer,
+            variant_title=f"{offer_type.title()} {random_text(rng, vocabulary, 2)}",
+            variant_price=base_price * factor,
+            delivery_time_in_days=base_delivery * factor,
+            revision_limit=factor,
+            offer_type=offer_type,
+            features=[random_text(rng, vocabulary, 2) for _ in range(factor)],
+        )
+        for offer_type, factor in OFFER_TIERS
+    ]
+
+
+def seed_benchmark_data(
+    businesses=50,
+    customers=200,
+    offers_per_business=5,
+    orders_per_customer=5,
+    reviews_per_customer=3,
+    seed=0,
+    batch_size=2000,
+):
+    """
+    Generates a deterministic data set with bulk inserts: business users and
+    customers with profiles and tokens, offers with three detail tiers,
+    orders in every status and reviews. Signals do not run for bulk inserts,
+    so the statistics counters are reconciled afterwards.
+    """
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng, size=500)
+    password = make_password(BENCHMARK_PASSWORD)
+
+    with transaction.atomic():
+        business_users = create_benchmark_users("business", businesses, seed, password)
+        customer_users = create_benchmark_users("customer", customers, seed, password)
+        BusinessProfile.objects.bulk_create(
+            (
+                BusinessProfile(
+                    user=user,
+                    company_name=random_text(rng, vocabulary, 2).title(),
+                    company_address=random_text(rng, vocabulary, 3),
+                    location=rng.choice(WORDS).title(),
+                )
+                for user in business_users
+            ),
+            batch_size=batch_size,
+        )
+        CustomerProfile.objects.bulk_create(
+            (
+                CustomerProfile(user=user, first_name="Customer", last_name=str(index))
+                for index, user in enumerate(customer_users)
+            ),
+            batch_size=batch_size,
+        )
+
+        offers = []
+        details = []
+        for user in business_users:
+            for _ in range(offers_per_business):
+                offer = Offer(
+                    user=user,
+                    title=random_text(rng, vocabulary, 4),
+                    description=random_text(rng, vocabulary, 30),
+                )
+                offer_details = build_offer_details(rng, offer, vocabulary)
+                offer.price = offer_details[0].variant_price
+                offer.delivery_time_in_days = offer_details[0].delivery_time_in_days
+                offers.append(offer)
+                details.extend(offer_details)
+        Offer.objects.bulk_create(offers, batch_size=batch_size)
+        OfferDetail.objects.bulk_create(details, batch_size=batch_size)
+
+        Order.objects.bulk_create(
+            (
+                Order(
+                    customer_user=customer,
+                    offer_detail=detail,
+                    status=ORDER_STATUSES[(index + number) % len(ORDER_STATUSES)],
+                    **snapshot_offer_detail(detail),
+                )
+                for index, customer in enumerate(customer_users)
+                for number, detail in enumerate(
+                    rng.sample(details, min(orders_per_customer, len(details)))
+                )
+            ),
+            batch_size=batch_size,
+        )
+
+        reviews_per_customer = min(reviews_per_customer, businesses - 1)
+        Review.objects.bulk_create(
+            (
+                Review(
+                    reviewer=customer,
+                    business_user=business_users[(index + offset) % businesses],
+                    rating=rng.randint(1, 5),
+                    description=random_text(rng, vocabulary, 12),
+                )
+                for index, customer in enumerate(customer_users)
+                for offset in range(1, reviews_per_customer + 1)
+            ),
+            batch_size=batch_size,
+        )
+
+        reconcile_site_statistics()
+        reconcile_business_stats()
+    bump_offer_cache_version()
+
+    return {
+        "business_users": len(business_users),
+        "customers": len(customer_users),
+        "offers": len(offers),
+        "offer_details": len(details),
+        "orders": Order.objects.filter(customer_user__in=customer_users).count(),
+        "reviews": Review.objects.filter(reviewer__in=customer_users).count(),
+    }
+
+
+# End of benchmarkData_logic.py
+
+
+# endpointBenchmark_logic.py
+def get_benchmark_fixtures():
+    """
+    Picks the generated objects the endpoint cases refer to. Customer 0 never
+    reviews business user 0, so creating that review is always possible.
+    Raises DoesNotExist when no benchmark data was seeded.
+    """
+    business_user = User.objects.get(username=benchmark_username("business", 0))
+    customer = User.objects.get(username=benchmark_username("customer", 0))
+    offer = Offer.objects.filter(user=business_user).earliest("id")
+    return {
+        "business_user": business_user,
+        "business_token": Token.objects.get(user=business_user).key,
+        "customer": customer,
+        "customer_token": Token.objects.get(user=customer).key,
+        "offer": offer,
+        "offer_detail": offer.details.earliest("id"),
+        "order": Order.objects.filter(customer_user=customer).earliest("id"),
+        "review": Review.objects.filter(reviewer=customer).earliest("id"),
+    }
+
+
+def endpoint_case(name, method, token=None, data=None, args=(), query=""):
+    return {
+        "key": f"{method.upper()} {name}{'' if token else ' (anonymous)'}",
+        "method": method,
+        "path": f"{reverse(name, args=args)}{query}",
+        "token": token,
+        "data": data,
+    }
+
+
+def build_endpoint_cases(fixtures):
+    """
+    Returns one request per route in coder_app/urls.py (some routes twice).
+    Writes are rolled back after every call.
+    """
+    business_id = fixtures["business_user"].id
+    customer_id = fixtures["customer"].id
+    business = fixtures["business_token"]
+    customer = fixtures["customer_token"]
+    registration = {
+        "username": f"{BENCHMARK_PREFIX}new",
+        "email": f"{BENCHMARK_PREFIX}new@example.com",
+        "password": BENCHMARK_PASSWORD,
+        "repeated_password": BENCHMARK_PASSWORD,
+        "type": "customer",
+    }
+    login = {"username": fixtures["customer"].username, "password": BENCHMARK_PASSWORD}
+    review = {"business_user": business_id, "rating": 4, "description": "Benchmark"}
+    order = {"offer_detail_id": fixtures["offer_detail"].id}
+    return [
+        endpoint_case("registration", "post", data=registration),
+        endpoint_case("login", "post", data=login),
+        endpoint_case("business-profile", "get", business, args=[business_id]),
+        endpoint_case("profile-detail", "get", customer, args=[customer_id]),
+        endpoint_case("business-profiles", "get", customer),
+        endpoint_case("customer-profiles", "get", business),
+        endpoint_case("customer-profile", "get", customer, args=[customer_id]),
+        endpoint_case(
+            "review-list-create", "get", customer, query=f"?business_user_id={business_id}"
+        ),
+        endpoint_case("review-list-create", "post", customer, data=review),
+        endpoint_case("review-detail", "get", customer, args=[fixtures["review"].id]),
+        endpoint_case("order-list", "get", customer),
+        endpoint_case("order-list", "post", customer, data=order),
+        endpoint_case("order-detail", "get", customer, args=[fixtures["order"].id]),
+        endpoint_case("order-count", "get", customer, args=[business_id]),
+        endpoint_case(
+            "order-stats", "get", customer, query=f"?business_user_ids={business_id}"
+        ),
+        endpoint_case("order-stats-detail", "get", customer, args=[business_id]),
+        endpoint_case("completed-order-count", "get", customer, args=[business_id]),
+        endpoint_case("offer-detail", "get", business, args=[fixtures["offer"].id]),
+        endpoint_case(
+            "offer-detail-retrieve", "get", customer, args=[fixtures["offer_detail"].id]
+        ),
+        endpoint_case("offers", "get"),
+        endpoint_case("offers", "get", customer),
+        endpoint_case("base-info", "get"),
+    ]
+
+
+def call_endpoint(client, case):
+    headers = {"HTTP_AUTHORIZATION": f"Token {case['token']}"} if case["token"] else {}
+    request = getattr(client, case["method"])
+    if case["method"] == "get":
+        return request(case["path"], **headers)
+    with transaction.atomic():
+        response = request(
+            case["path"], case["data"], content_type="application/json", **headers
+        )
+        transaction.set_rollback(True)
+    return response
+
+
+def measure_endpoint(client, case, repeat):
+    """
+    Calls the endpoint repeatedly and returns latency percentiles, the
+    median query count and the most common status code.
+    """
+    timings = []
+    queries = []
+    statuses = Counter()
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            response = call_endpoint(client, case)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(context.captured_queries))
+        statuses[response.status_code] += 1
+    return {
+        "method": case["method"].upper(),
+        "path": case["path"],
+        "status": statuses.most_common(1)[0][0],
+        **summarize_timings(timings),
+        "queries": int(statistics.median(queries)),
+    }
+
+
+def run_endpoint_benchmarks(repeat=20, only=None):
+    """
+    Benchmarks every endpoint through the test client against the seeded
+    data. Throttling is switched off for the run; the views read their
+    throttle classes when they are defined, so get_throttles is patched
+    instead of the settings.
+    """
+    cases = build_endpoint_cases(get_benchmark_fixtures())
+    if only:
+        cases = [case for case in cases if any(name in case["key"] for name in only)]
+    with patch.object(APIView, "get_throttles", return_value=[]):
+        client = Client(HTTP_HOST="localhost")
+        return {case["key"]: measure_endpoint(client, case, repeat) for case in cases}
+
+
+def compare_with_baseline(results, baseline, tolerance=0.2):
+    """
+    Returns one row per endpoint in both runs. A row is a regression when
+    p95 grew by more than ``tolerance`` or more queries were needed.
+    """
+    rows = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        p95_change = (
+            (current["p95_ms"] - previous["p95_ms"]) / previous["p95_ms"]
+            if previous["p95_ms"]
+            else 0.0
+        )
+        rows.append(
+            {
+                "endpoint": key,
+                "p95_ms": current["p95_ms"],
+                "baseline_p95_ms": previous["p95_ms"],
+                "p95_change": f"{p95_change:+.0%}",
+                "queries": current["queries"],
+                "baseline_queries": previous["queries"],
+                "regression": p95_change > tolerance
+                or current["queries"] > previous["queries"],
+            }
+        )
+    return rows
+
+
+# End of endpointBenchmark_logic.py
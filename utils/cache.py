@@ -0,0 +1,203 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+from utils.metrics import record_cache_lookup
+
+
+# responseCache_logic.py
+RESPONSE_CACHE_ALIAS = "responses"
+OFFER_VERSION_KEY = "offers:version"
+COUNTER_KEY = "offers:{namespace}:{counter}"
+
+
+def get_response_cache():
+    return caches[RESPONSE_CACHE_ALIAS]
+
+
+def get_offer_cache_version():
+    """
+    Returns the current offer data version. A fresh version is seeded from
+    the clock so an evicted key never revives old entries.
+    """
+    cache = get_response_cache()
+    version = cache.get(OFFER_VERSION_KEY)
+    if version is None:
+        cache.add(OFFER_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(OFFER_VERSION_KEY)
+    return version
+
+
+def bump_offer_cache_version(**kwargs):
+    """
+    Invalidates every cached offer response by moving to a new version once
+    the current transaction commits. Bumping earlier would let a concurrent
+    read cache the uncommitted state under the new version. Usable directly
+    as a signal receiver; outside a transaction it bumps immediately.
+    """
+    transaction.on_commit(move_offer_cache_version)
+
+
+def move_offer_cache_version():
+    cache = get_response_cache()
+    try:
+        cache.incr(OFFER_VERSION_KEY)
+    except ValueError:
+        cache.add(OFFER_VERSION_KEY, time.time_ns(), None)
+
+
+def increment_counter(namespace, counter):
+    cache = get_response_cache()
+    key = COUNTER_KEY.format(namespace=namespace, counter=counter)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def get_response_cache_stats(namespaces=("offer-list", "offer-detail")):
+    """
+    Returns hit and miss counters for each cached endpoint.
+    """
+    cache = get_response_cache()
+    return {
+        namespace: {
+            counter: cache.get(COUNTER_KEY.format(namespace=namespace, counter=counter), 0)
+            for counter in ("hits", "misses")
+        }
+        for namespace in namespaces
+    }
+
+
+def build_response_cache_key(request, namespace):
+    """
+    Builds a key from host, path and the sorted query parameters, so the same
+    filters in a different order share one entry.
+    """
+    params = sorted(
+        (key, value)
+        for key, values in request.query_params.lists()
+        for value in values
+    )
+    raw = f"{request.get_host()}{request.path}?{urlencode(params)}"
+    digest = hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+    return f"offers:{namespace}:{get_offer_cache_version()}:{digest}"
+
+
+def is_cacheable_request(request):
+    return request.method == "GET" and not request.user.is_authenticated
+
+
+def get_cached_response(request, namespace, build_response):
+    """
+    Serves anonymous GET requests from the response cache and stores
+    successful responses built by ``build_response`` with their validators.
+    """
+    if not is_cacheable_request(request):
+        return build_response()
+
+    cache = get_response_cache()
+    key = build_response_cache_key(request, namespace)
+    cached = cache.get(key)
+    if cached is not None:
+        increment_counter(namespace, "hits")
+        record_cache_lookup("response", hit=True)
+        return conditional_response(
+            request,
+            lambda: (cached["etag"], cached["last_modified"]),
+            lambda: Response(cached["data"]),
+        )
+
+    increment_counter(namespace, "misses")
+    record_cache_lookup("response", hit=False)
+    response = build_response()
+    if response.status_code == 200:
+        cache.set(
+            key,
+            {
+                "data": response.data,
+                "etag": getattr(response, "etag", None),
+                "last_modified": getattr(response, "last_modified", None),
+            },
+        )
+    return response
+
+
+# End of responseCache_logic.py
+
+
+# conditionalGet_logic.py
+def build_validators(last_modified, *parts):
+    """
+    Returns an ETag and a Last-Modified timestamp describing the given state.
+    """
+    raw = "|".join(
+        str(part)
+        for part in (last_modified.isoformat() if last_modified else None, *parts)
+    )
+    etag = quote_etag(hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest())
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return etag, timestamp
+
+
+def get_queryset_validators(queryset, *parts, related=()):
+    """
+    Derives validators from MAX(updated_at) and COUNT(*) in one query,
+    without loading or serializing any rows. ``related`` names further
+    updated_at lookups of rows embedded in the response, e.g. the owner.
+    """
+    aggregates = {f"related_{index}": Max(lookup) for index, lookup in enumerate(related)}
+    state = queryset.order_by().aggregate(
+        last_modified=Max("updated_at"), count=Count("pk"), **aggregates
+    )
+    last_modified = max(
+        (value for key, value in state.items() if key != "count" and value),
+        default=None,
+    )
+    related_parts = (state[key] for key in aggregates)
+    return build_validators(last_modified, state["count"], *related_parts, *parts)
+
+
+def apply_validators(response, etag, last_modified):
+    response.etag = etag
+    response.last_modified = last_modified
+    if etag:
+        response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    patch_vary_headers(response, ["Authorization"])
+    return response
+
+
+def conditional_response(request, get_validators, build_response):
+    """
+    Answers If-None-Match / If-Modified-Since with 304 before the body is
+    built; otherwise builds the response and attaches the validators.
+    """
+    etag, last_modified = get_validators()
+    if etag is None and last_modified is None:
+        return build_response()
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = build_response()
+        if response.status_code != 200:
+            return response
+    return apply_validators(response, etag, last_modified)
+
+
+# End of conditionalGet_logic.py
@@ -0,0 +1,63 @@
+import atexit
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+# sqliteTuning_logic.py
+SQLITE_PRODUCTION_PROFILE = "sqlite-production"
+
+
+def is_sqlite_production():
+    return getattr(settings, "DATABASE_PROFILE", "default") == SQLITE_PRODUCTION_PROFILE
+
+
+def get_sqlite_pragmas():
+    """
+    Returns the PRAGMAs of the sqlite-production profile in execution order.
+    busy_timeout comes first so switching the journal mode waits for locks.
+    """
+    options = getattr(settings, "SQLITE_TUNING", {})
+    return {
+        "busy_timeout": options.get("BUSY_TIMEOUT", 5000),
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": options.get("MMAP_SIZE", 256 * 1024 * 1024),
+        "cache_size": options.get("CACHE_SIZE", -20000),
+        "temp_store": "MEMORY",
+    }
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Signal receiver: tunes every new SQLite connection. With persistent
+    connections this runs once per worker instead of once per request.
+    """
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for pragma, value in get_sqlite_pragmas().items():
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+def optimize_sqlite_connections():
+    """
+    Runs PRAGMA optimize on every open SQLite connection, so the query
+    planner statistics stay current. Registered to run at process exit.
+    """
+    for connection in connections.all(initialized_only=True):
+        if connection.vendor != "sqlite" or connection.connection is None:
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA optimize")
+
+
+def enable_sqlite_production_profile():
+    connection_created.connect(
+        apply_sqlite_pragmas, dispatch_uid="coder_app.apply_sqlite_pragmas"
+    )
+    atexit.register(optimize_sqlite_connections)
+
+
+# End of sqliteTuning_logic.py
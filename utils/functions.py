@@ -1,15 +1,45 @@
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Avg, Count, Sum
+from django.utils import timezone
 from coder_app.models import Review
 from coder_app.models import Review
 from django.contrib.auth.models import User
-from rest_framework.exceptions import NotFound
-from coder_app.models import Offer, OfferDetail, Review, BusinessProfile, Order
-from coder_app.serializers import ReviewSerializer
+from rest_framework.exceptions import NotFound, ValidationError
+from django.core.exceptions import ValidationError as DjangoValidationError
+from coder_app.models import (
+    Offer,
+    OfferDetail,
+    Review,
+    BusinessProfile,
+    Order,
+    SiteStatistics,
+)
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from rest_framework.pagination import PageNumberPagination
+from django.utils.encoding import filepath_to_uri
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+import base64
+import itertools
+import json
+from django.core.serializers.json import DjangoJSONEncoder
 from rest_framework.exceptions import PermissionDenied
+from utils.middleware import serializer_timer
+from utils.utils import (
+    PROFILE_RELATIONS,
+    apply_offer_detail_data,
+    build_offer_detail,
+    get_business_stats,
+    get_profile,
+    get_profile_type,
+    has_profile,
+    save_offer_details,
+    snapshot_offer_detail,
+)
 
 
 # customerProfileView_logic.py
@@ -18,7 +48,7 @@ def get_customer_profile_or_error(user):
     Checks if a user has a `customer_profile`.
     Returns the profile or an detail response if not found.
     """
-    if not hasattr(user, "customer_profile"):
+    if not is_customer(user):
         return Response(
             {"detail": "Customer profile not found."}, status=status.HTTP_404_NOT_FOUND
         )
@@ -55,53 +85,22 @@ def get_offer_or_404(offer_id):
 
 def create_or_update_details(offer, details_data):
     """
-    Creates or updates offer details.
+    Creates or updates offer details with bulk queries in one transaction.
     """
     existing_details = {detail.id: detail for detail in offer.details.all()}
-    updated_ids = set()
+    created, updated = [], {}
 
     for detail_data in details_data:
         detail_id = detail_data.get("id")
         if detail_id and detail_id in existing_details:
-            update_offer_details(existing_details[detail_id], detail_data)
-            updated_ids.add(detail_id)
+            detail_instance = existing_details[detail_id]
+            apply_offer_detail_data(detail_instance, detail_data)
+            updated[detail_id] = detail_instance
         else:
-            OfferDetail.objects.create(
-                offer=offer,
-                variant_title=detail_data["title"],
-                variant_price=detail_data["price"],
-                revision_limit=detail_data["revisions"],
-                delivery_time_in_days=detail_data["delivery_time_in_days"],
-                features=detail_data["features"],
-                offer_type=detail_data["offer_type"],
-            )
-
-    for detail_id in existing_details.keys():
-        if detail_id not in updated_ids:
-            existing_details[detail_id].delete()
+            created.append(build_offer_detail(offer, detail_data))
 
-
-def update_offer_details(detail_instance, detail_data):
-    """
-    Updates an existing offer detail.
-    """
-    detail_instance.variant_title = detail_data.get(
-        "title", detail_instance.variant_title
-    )
-    detail_instance.variant_price = detail_data.get(
-        "price", detail_instance.variant_price
-    )
-    detail_instance.revision_limit = detail_data.get(
-        "revisions", detail_instance.revision_limit
-    )
-    detail_instance.delivery_time_in_days = detail_data.get(
-        "delivery_time_in_days", detail_instance.delivery_time_in_days
-    )
-    detail_instance.features = detail_data.get("features", detail_instance.features)
-    detail_instance.offer_type = detail_data.get(
-        "offer_type", detail_instance.offer_type
-    )
-    detail_instance.save()
+    deleted_ids = [detail_id for detail_id in existing_details if detail_id not in updated]
+    save_offer_details(offer, created, list(updated.values()), deleted_ids)
 
 
 # End of offerDetailView_logic.py
@@ -114,14 +113,10 @@ def get_user_and_profile(pk):
     Retrieve the user and associated profile by primary key.
     """
     try:
-        user = User.objects.get(pk=pk)
-        if hasattr(user, "business_profile"):
-            return user, user.business_profile, "business"
-        elif hasattr(user, "customer_profile"):
-            return user, user.customer_profile, "customer"
+        user = User.objects.select_related(*PROFILE_RELATIONS.values()).get(pk=pk)
     except User.DoesNotExist:
         return None, None, None
-    return user, None, None
+    return user, get_profile(user), get_profile_type(user)
 
 
 def update_user_data(user, data):
@@ -227,95 +222,172 @@ def format_profile_response(user, profile, profile_type):
 
 
 # reviewListCreateView_logic.py
+REVIEW_ORDERINGS = ("updated_at", "-updated_at", "rating", "-rating")
+
+
 def get_filtered_reviews(user, query_params):
     """
     Filters reviews based on query parameters.
+
+    Only orderings from ``REVIEW_ORDERINGS`` are accepted; each is served by
+    a composite index together with the business user or reviewer filter.
+    Unknown values fall back to ``updated_at``.
     """
     business_user_id = query_params.get("business_user_id")
     reviewer_id = query_params.get("reviewer_id")
-    ordering = query_params.get("ordering", "updated_at")
+    ordering = query_params.get("ordering")
+    if ordering not in REVIEW_ORDERINGS:
+        ordering = "updated_at"
+    order_by = (ordering, "-id" if ordering.startswith("-") else "id")
 
-    if hasattr(user, "customer_profile") and not business_user_id:
-        return Review.objects.filter(reviewer=user).order_by(ordering)
+    if is_customer(user) and not business_user_id:
+        return Review.objects.filter(reviewer=user).order_by(*order_by)
 
     reviews = Review.objects.all()
     if business_user_id:
         reviews = reviews.filter(business_user_id=business_user_id)
     if reviewer_id:
         reviews = reviews.filter(reviewer_id=reviewer_id) 
-    return reviews.order_by(ordering)
+    return reviews.order_by(*order_by)
 
 
 def is_customer(user):
     """
     Checks if the user has a customer profile.
     """
-    return hasattr(user, "customer_profile")
+    return has_profile(user, "customer")
 
 
-def get_business_user(data):
+def is_business_user(user):
     """
-    Retrieves the business user based on the request data.
+    Checks if the user has a business profile.
     """
-    business_user_id = data.get("business_user")
-    return get_object_or_404(User, id=business_user_id)
+    return has_profile(user, "business")
 
 
-def is_business_user(user):
+DUPLICATE_REVIEW_MESSAGE = "You have already reviewed this business user."
+
+
+def save_review(serializer, success_status=status.HTTP_200_OK, **kwargs):
     """
-    Checks if the user has a business profile.
+    Saves a validated review. Uniqueness per reviewer and business user is
+    enforced by the database constraint, so no EXISTS pre-check is needed
+    and concurrent submissions cannot both succeed. Other integrity errors
+    are re-raised instead of being reported as duplicates.
     """
-    return hasattr(user, "business_profile")
+    try:
+        with transaction.atomic():
+            serializer.save(**kwargs)
+    except IntegrityError:
+        if not is_duplicate_review(serializer, kwargs.get("reviewer")):
+            raise
+        return {"detail": DUPLICATE_REVIEW_MESSAGE}, status.HTTP_400_BAD_REQUEST
+    return serializer.data, success_status
 
 
-def has_existing_review(reviewer, business_user):
+def is_duplicate_review(serializer, reviewer=None):
     """
-    Checks if a review already exists for the given reviewer and business user.
+    Checks whether another review of the same reviewer and business user
+    exists, i.e. whether unique_review_per_business caused the failure.
     """
-    return Review.objects.filter(
-        reviewer=reviewer, business_user=business_user
-    ).exists()
+    instance = serializer.instance
+    reviewer_id = reviewer.pk if reviewer else instance.reviewer_id
+    business_user = serializer.validated_data.get("business_user")
+    business_user_id = business_user.pk if business_user else instance.business_user_id
+    reviews = Review.objects.filter(reviewer_id=reviewer_id, business_user_id=business_user_id)
+    if instance is not None:
+        reviews = reviews.exclude(pk=instance.pk)
+    return reviews.exists()
 
 
-def create_review(data, reviewer, business_user, context):
+def create_review(serializer, reviewer):
     """
-    Creates and saves a new review.
+    Creates a review from a validated serializer.
     """
-    serializer = ReviewSerializer(data=data, context=context)
-    if serializer.is_valid():
-        serializer.save(reviewer=reviewer, business_user=business_user)
-        return serializer.data, status.HTTP_201_CREATED
-    return serializer.errors, status.HTTP_400_BAD_REQUEST
+    if not is_business_user(serializer.validated_data["business_user"]):
+        return (
+            {"detail": "The specified user is not a business user."},
+            status.HTTP_400_BAD_REQUEST,
+        )
+    return save_review(serializer, status.HTTP_201_CREATED, reviewer=reviewer)
 
 
 # End of reviewListCreateView_logic.py
 
 
 # baseInfoView_logic.py
+SITE_STATISTICS_ID = 1
+
+
 def calculate_average_rating(business_user=None):
     """
     Calculates the average rating. Optionally, can specify a business user.
     """
-    queryset = Review.objects.all()
     if business_user:
-        queryset = queryset.filter(business_user=business_user)
-    return queryset.aggregate(avg_rating=Avg("rating"))["avg_rating"] or 0.0
+        return get_business_stats(business_user).average_rating or 0.0
+    return Review.objects.aggregate(avg_rating=Avg("rating"))["avg_rating"] or 0.0
+
+
+def compute_site_statistics():
+    """
+    Computes the platform totals from scratch with aggregate queries.
+    """
+    ratings = Review.objects.aggregate(count=Count("id"), total=Sum("rating"))
+    return {
+        "offer_count": Offer.objects.count(),
+        "review_count": ratings["count"],
+        "rating_sum": ratings["total"] or 0,
+        "business_profile_count": BusinessProfile.objects.count(),
+    }
+
+
+def reconcile_site_statistics():
+    """
+    Rewrites the materialized statistics row from the live tables.
+    """
+    statistics, _ = SiteStatistics.objects.update_or_create(
+        pk=SITE_STATISTICS_ID, defaults=compute_site_statistics()
+    )
+    return statistics
+
+
+def adjust_site_statistics(**deltas):
+    """
+    Applies counter deltas in a single UPDATE; creates the row on first use.
+    Decrements stop at zero, so drift never fails the triggering save.
+    """
+    changes = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+        if delta
+    }
+    if not changes:
+        return
+    updated = SiteStatistics.objects.filter(pk=SITE_STATISTICS_ID).update(
+        **changes, updated_at=timezone.now()
+    )
+    if not updated:
+        reconcile_site_statistics()
 
 
 def collect_statistics():
     """
-    Collects and calculates the app's basic statistics.
+    Returns the app's basic statistics from the materialized row.
     """
-    offer_count = Offer.objects.count()
-    review_count = Review.objects.count()
-    business_profile_count = BusinessProfile.objects.count()
-    average_rating = calculate_average_rating()
+    statistics = SiteStatistics.objects.filter(pk=SITE_STATISTICS_ID).first()
+    if statistics is None:
+        statistics = reconcile_site_statistics()
+    average_rating = (
+        statistics.rating_sum / statistics.review_count
+        if statistics.review_count
+        else 0.0
+    )
 
     return {
-        "review_count": review_count,
+        "review_count": statistics.review_count,
         "average_rating": round(average_rating, 1),
-        "business_profile_count": business_profile_count,
-        "offer_count": offer_count,
+        "business_profile_count": statistics.business_profile_count,
+        "offer_count": statistics.offer_count,
     }
 
 
@@ -334,9 +406,10 @@ def handle_exception(exception):
 # orderListView_logic.py
 def get_orders_for_user(user):
     """
-    Returns orders for the authenticated user.
+    Returns orders for the authenticated user. The serializer reads only
+    the order's own snapshot columns, so no joins are needed.
     """
-    if hasattr(user, "business_profile"):
+    if is_business_user(user):
         return Order.objects.filter(business_user=user)
     return Order.objects.filter(customer_user=user)
 
@@ -354,16 +427,9 @@ def create_order(customer_user, offer_detail):
     """
     return Order.objects.create(
         customer_user=customer_user,
-        business_user=offer_detail.offer.user,
-        offer=offer_detail.offer,
         offer_detail=offer_detail,
-        title=offer_detail.variant_title,
-        revisions=offer_detail.revision_limit,
-        delivery_time_in_days=offer_detail.delivery_time_in_days,
-        price=offer_detail.variant_price,
-        features=offer_detail.features,
-        offer_type=offer_detail.offer_type,
         status="in_progress",
+        **snapshot_offer_detail(offer_detail),
     )
 
 
@@ -385,37 +451,125 @@ def update_order_status(order, new_status):
 # End of orderDetailView_logic.py
 
 
-# orderCountView_logic.de
-# completedOrderCountView_logic.de
-def fetch_business_user_by_id(business_user_id):
+# orderStatsView_logic.py
+# orderCountView_logic.py
+# completedOrderCountView_logic.py
+MAX_ORDER_STATS_USERS = 100
+
+
+def serialize_order_stats(stats):
     """
-    Fetches a business user by their ID, returning None if not found.
+    Returns the order count for every status in Order.STATUS_CHOICES.
     """
-    try:
-        return User.objects.get(id=business_user_id)
-    except User.DoesNotExist:
-        return None
+    return {status: stats.order_count(status) for status, _ in Order.STATUS_CHOICES}
+
+
+def get_order_stats(business_user_ids):
+    """
+    Loads the order counts of many business users in one query.
+    Unknown user ids are left out of the result.
+    """
+    users = User.objects.filter(id__in=business_user_ids).select_related(
+        "business_stats"
+    )
+    return {user.id: serialize_order_stats(get_business_stats(user)) for user in users}
 
 
-def get_order_count(business_user, status):
+def parse_business_user_ids(value):
     """
-    Retrieves the order count for a specific business user and status.
+    Parses a comma-separated list of business user ids.
     """
-    return Order.objects.filter(business_user=business_user, status=status).count()
+    try:
+        ids = {int(part) for part in value.split(",") if part.strip()}
+    except ValueError:
+        raise ValidationError({"business_user_ids": "Expected comma-separated ids."})
+    if not ids:
+        raise ValidationError({"business_user_ids": "This parameter is required."})
+    if len(ids) > MAX_ORDER_STATS_USERS:
+        raise ValidationError(
+            {"business_user_ids": f"At most {MAX_ORDER_STATS_USERS} ids are allowed."}
+        )
+    return ids
 
 
-# End of orderCountView_logic.de
+# End of orderStatsView_logic.py
+# End of orderCountView_logic.py
 # End of completedOrderCountView_logic.py
 
 
 # businessProfileListView_logic.py
 # customerProfileListView_logic.py
-def format_common_profile_data(profile, request):
+PROFILE_USER_FIELDS = ("user__id", "user__username", "user__first_name", "user__last_name")
+
+
+class ProfilePagination(PageNumberPagination):
+    """
+    Opt-in pagination for the profile lists (``?page=`` or ``?page_size=``).
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+def is_pagination_requested(request):
+    """
+    Lists keep returning plain arrays unless the client sends ``page`` or
+    ``page_size``.
+    """
+    params = request.query_params
+    return "page" in params or "page_size" in params
+
+
+def get_profile_list_queryset(model, *fields):
+    """
+    Loads profiles together with their users, restricted to the listed columns.
+    """
+    return (
+        model.objects.select_related("user")
+        .only("id", "user", "file", *fields, *PROFILE_USER_FIELDS)
+        .order_by("id")
+    )
+
+
+def get_media_url_prefix(request):
+    """
+    Resolves the absolute media URL once per request instead of per file.
+    """
+    return request.build_absolute_uri(settings.MEDIA_URL)
+
+
+def build_media_url(file, media_prefix):
+    return f"{media_prefix}{filepath_to_uri(file.name)}" if file else None
+
+
+def list_profiles(request, profiles, format_profile_data):
+    """
+    Formats every profile, or one page of them when the client asks for
+    pagination. Unpaginated lists are read with a chunked iterator.
+    """
+    media_prefix = get_media_url_prefix(request)
+    if is_pagination_requested(request):
+        paginator = ProfilePagination()
+        page = paginator.paginate_queryset(profiles, request)
+        with serializer_timer():
+            data = [format_profile_data(profile, media_prefix) for profile in page]
+        return paginator.get_paginated_response(data)
+    data = []
+    for profile in profiles.iterator(chunk_size=500):
+        with serializer_timer():
+            data.append(format_profile_data(profile, media_prefix))
+    return Response(data, status=status.HTTP_200_OK)
+
+
+def format_common_profile_data(profile, request=None, media_prefix=None):
     """
     Formats the common data for any profile type.
     """
     user = profile.user
-    file_url = request.build_absolute_uri(profile.file.url) if profile.file else None
+    if media_prefix is None:
+        media_prefix = get_media_url_prefix(request)
+    file_url = build_media_url(profile.file, media_prefix)
     return {
         "user": {
             "pk": user.id,
@@ -438,7 +592,8 @@ def apply_ordering(queryset, ordering):
 
     Args:
         queryset (QuerySet): The queryset to order.
-        ordering (str): The ordering parameter, e.g., "updated_at" or "min_price".
+        ordering (str): The ordering parameter, e.g., "updated_at", "min_price"
+            or "relevance" for ranked search results.
 
     Returns:
         QuerySet: The ordered queryset.
@@ -449,6 +604,8 @@ def apply_ordering(queryset, ordering):
         return queryset.order_by("updated_at")
     elif ordering in ["min_price", "-min_price"]:
         return queryset.order_by(ordering)
+    elif ordering == "relevance" and "search_rank" in queryset.query.annotations:
+        return queryset.order_by("search_rank", "-updated_at")
     return queryset.order_by("-updated_at")
 
 
@@ -542,6 +699,155 @@ class CustomPagination(PageNumberPagination):
             }
         )
 
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on (ordering field, id).
+
+    Each page is fetched with a range predicate instead of an OFFSET and no
+    COUNT(*) is issued, so deep pages cost the same as the first one.
+    """
+
+    page_size = 6
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering_fields = ()
+    default_ordering = None
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        ordering = self.get_ordering(queryset)
+        self.field = ordering.lstrip("-")
+        self.descending = ordering.startswith("-")
+        self.output_field = self.get_output_field(queryset)
+
+        expression = F(self.field)
+        expression = (
+            expression.desc(nulls_last=True)
+            if self.descending
+            else expression.asc(nulls_last=True)
+        )
+        queryset = queryset.order_by(expression, "-id" if self.descending else "id")
+
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.get_cursor_filter(*cursor))
+
+        results = list(queryset[: self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[: self.page_size]
+        self.last_item = results[-1] if results else None
+        return results
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(page_size, self.max_page_size) if page_size > 0 else self.page_size
+
+    def get_ordering(self, queryset):
+        """
+        Uses the first ordering of the queryset when it is a supported key.
+        """
+        order_by = queryset.query.order_by
+        ordering = order_by[0] if order_by and isinstance(order_by[0], str) else None
+        if ordering and ordering.lstrip("-") in self.ordering_fields:
+            return ordering
+        return self.default_ordering
+
+    def get_output_field(self, queryset):
+        if self.field in queryset.query.annotations:
+            return queryset.query.annotations[self.field].output_field
+        return queryset.model._meta.get_field(self.field)
+
+    def get_cursor_filter(self, value, pk):
+        """
+        Returns the predicate selecting every row after (value, pk).
+        Rows without a value are sorted last in both directions.
+        """
+        lookup = "lt" if self.descending else "gt"
+        if value is None:
+            return Q(**{f"{self.field}__isnull": True, f"id__{lookup}": pk})
+        return (
+            Q(**{f"{self.field}__{lookup}": value})
+            | Q(**{self.field: value, f"id__{lookup}": pk})
+            | Q(**{f"{self.field}__isnull": True})
+        )
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            if payload["o"] != self.field:
+                raise ValueError("Cursor was created for another ordering.")
+            value = payload["v"]
+            return (
+                None if value is None else self.output_field.to_python(value),
+                int(payload["id"]),
+            )
+        except (TypeError, ValueError, KeyError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, item):
+        value = getattr(item, self.field)
+        if value is not None:
+            value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+        payload = json.dumps({"o": self.field, "v": value, "id": item.pk})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def get_next_link(self):
+        if not self.has_next or self.last_item is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(self.last_item)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+
+class OfferCursorPagination(KeysetPagination):
+    """
+    Opt-in infinite-scroll pagination for the offer list (``?cursor=``).
+    """
+
+    ordering_fields = ("updated_at", "min_price")
+    default_ordering = "-updated_at"
+
+
+class OrderCursorPagination(KeysetPagination):
+    """
+    Opt-in pagination for the order list (``?cursor=``), newest first.
+    """
+
+    page_size = 20
+    ordering_fields = ("created_at",)
+    default_ordering = "-created_at"
+
+
+def stream_json_array(queryset, serializer_class, chunk_size=500):
+    """
+    Yields a JSON array of serialized rows chunk by chunk, so exports never
+    hold the whole result set in memory.
+    """
+    rows = queryset.iterator(chunk_size=chunk_size)
+    separator = ""
+    yield "["
+    while chunk := list(itertools.islice(rows, chunk_size)):
+        for item in serializer_class(chunk, many=True).data:
+            yield separator + json.dumps(item, cls=DjangoJSONEncoder)
+            separator = ","
+    yield "]"
+
+
 # reviewDetailView_logic.py
 def get_review_or_404(review_id):
     """
@@ -0,0 +1,345 @@
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+
+from django.contrib.auth.models import User
+
+from coder_app.models import OfferDetail, Review
+from utils.benchmarks import BENCHMARK_PASSWORD, BENCHMARK_PREFIX, WORDS
+
+
+# loadTest_logic.py
+OFFER_ORDERINGS = ("updated_at", "-updated_at", "min_price", "-min_price")
+
+
+def get_journey_fixtures(limit=1000):
+    """
+    Loads the seeded customers and offer details the journeys pick from,
+    and the business users each customer has already reviewed. Returns None
+    when seed_benchmark_data has not been run.
+    """
+    customers = list(
+        User.objects.filter(
+            username__startswith=f"{BENCHMARK_PREFIX}customer-"
+        ).values_list("username", flat=True)[:limit]
+    )
+    details = list(
+        OfferDetail.objects.filter(offer__user__username__startswith=BENCHMARK_PREFIX)
+        .values_list("id", "offer_id", "offer__user_id")[:limit]
+    )
+    if not customers or not details:
+        return None
+    reviewed = defaultdict(set)
+    for username, business_user_id in Review.objects.filter(
+        reviewer__username__in=customers
+    ).values_list("reviewer__username", "business_user_id"):
+        reviewed[username].add(business_user_id)
+    return {
+        "customers": customers,
+        "details": details,
+        "businesses": sorted({business_user_id for _, _, business_user_id in details}),
+        "reviewed": reviewed,
+    }
+
+
+def send_request(base_url, method, path, token=None, data=None, timeout=30):
+    """
+    Sends one blocking HTTP request and returns (status, body, elapsed ms).
+    Connection failures are reported with status 0.
+    """
+    headers = {"Accept": "application/json"}
+    body = None
+    if token:
+        headers["Authorization"] = f"Token {token}"
+    if data is not None:
+        headers["Content-Type"] = "application/json"
+        body = json.dumps(data).encode()
+    request = urllib.request.Request(
+        f"{base_url}{path}", data=body, headers=headers, method=method
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            status, content = response.status, response.read()
+    except urllib.error.HTTPError as error:
+        status, content = error.code, error.read()
+    except (urllib.error.URLError, OSError) as error:
+        status, content = 0, str(error).encode()
+    return status, content, (time.perf_counter() - start) * 1000
+
+
+class RateLimiter:
+    """
+    Spaces request starts evenly so all virtual users together stay at the
+    target rate.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = None
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.interval:
+            return
+        async with self.lock:
+            now = time.monotonic()
+            if self.next_slot is None or self.next_slot < now:
+                self.next_slot = now
+            wait = self.next_slot - now
+            self.next_slot += self.interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class LoadTestReport:
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.lock_errors = None
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def record(self, step, status, elapsed):
+        self.timings[step].append(elapsed)
+        self.statuses[step][status] += 1
+
+    def add_server_log(self, lines):
+        """
+        Takes the SQLite lock errors from the server's request log. With
+        DEBUG off the 500 bodies do not name the cause, so only the server
+        can tell them apart from other failures.
+        """
+        self.lock_errors = count_lock_errors(lines)
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    def step_summary(self, step):
+        timings = sorted(self.timings[step])
+        statuses = self.statuses[step]
+        return {
+            "step": step,
+            "requests": len(timings),
+            "p50_ms": percentile(timings, 0.50),
+            "p95_ms": percentile(timings, 0.95),
+            "p99_ms": percentile(timings, 0.99),
+            "max_ms": round(timings[-1], 1),
+            "2xx": sum(count for code, count in statuses.items() if 200 <= code < 300),
+            "4xx": sum(count for code, count in statuses.items() if 400 <= code < 500),
+            "5xx": sum(count for code, count in statuses.items() if code >= 500),
+            "failed": statuses[0],
+        }
+
+    def summary(self, target_rate):
+        steps = [self.step_summary(step) for step in self.timings]
+        requests = sum(step["requests"] for step in steps)
+        errors = sum(step["5xx"] + step["failed"] for step in steps)
+        duration = (self.finished or time.perf_counter()) - self.started
+        all_timings = sorted(t for timings in self.timings.values() for t in timings)
+        return {
+            "duration_s": round(duration, 1),
+            "requests": requests,
+            "target_rps": target_rate,
+            "throughput_rps": round(requests / duration, 1) if duration else 0.0,
+            "p50_ms": percentile(all_timings, 0.50),
+            "p95_ms": percentile(all_timings, 0.95),
+            "p99_ms": percentile(all_timings, 0.99),
+            "error_rate": round(errors / requests, 4) if requests else 0.0,
+            "sqlite_lock_errors": (
+                None if self.lock_errors is None else sum(self.lock_errors.values())
+            ),
+            "sqlite_lock_errors_by_view": self.lock_errors,
+            "steps": steps,
+        }
+
+
+def count_lock_errors(lines):
+    """
+    Sums the db_locked counts of the JSON lines written by the request log
+    (coder_app.requests), per URL name.
+    """
+    locked = Counter()
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(entry, dict) and entry.get("db_locked"):
+            locked[entry.get("url_name") or "unmatched"] += entry["db_locked"]
+    return dict(locked)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return round(sorted_values[index], 1)
+
+
+def pick_review_target(rng, fixtures, username, business_user_id):
+    """
+    Returns a business user the customer has not reviewed yet, preferring
+    the seller of the ordered offer, and marks it as reviewed. Returns None
+    once every business has a review from this customer, so the journeys
+    never measure the duplicate-review rejection.
+    """
+    reviewed = fixtures["reviewed"][username]
+    if business_user_id in reviewed:
+        candidates = [
+            business for business in fixtures["businesses"] if business not in reviewed
+        ]
+        if not candidates:
+            return None
+        business_user_id = rng.choice(candidates)
+    reviewed.add(business_user_id)
+    return business_user_id
+
+
+def build_journey(rng, fixtures, username):
+    """
+    Returns the steps of one customer visit: browse offers with filters,
+    open an offer and one of its tiers, order it and review a seller the
+    customer has not reviewed yet.
+    """
+    detail_id, offer_id, business_user_id = rng.choice(fixtures["details"])
+    browse = urlencode(
+        {
+            "search": rng.choice(WORDS),
+            "ordering": rng.choice(OFFER_ORDERINGS),
+            "max_delivery_time": rng.randint(3, 30),
+            "page_size": 6,
+        }
+    )
+    steps = [
+        ("browse offers", "GET", f"/api/offers/?{browse}", None),
+        ("open offer", "GET", f"/api/offers/{offer_id}/", None),
+        ("offer detail", "GET", f"/api/offerdetails/{detail_id}/", None),
+        ("place order", "POST", "/api/orders/", {"offer_detail_id": detail_id}),
+    ]
+    review_target = pick_review_target(rng, fixtures, username, business_user_id)
+    if review_target is not None:
+        review = {
+            "business_user": review_target,
+            "rating": rng.randint(1, 5),
+            "description": "Load test review",
+        }
+        steps.append(("post review", "POST", "/api/reviews/", review))
+    return steps
+
+
+def read_token(content):
+    """
+    Returns the token of a login response, or None for an unexpected body,
+    which counts as a failed login.
+    """
+    try:
+        return json.loads(content)["token"]
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+async def run_virtual_user(
+    number, base_url, fixtures, limiter, report, deadline, executor
+):
+    """
+    Logs in as one seeded customer, then repeats journeys until the deadline.
+    """
+    loop = asyncio.get_running_loop()
+    rng = random.Random(number)
+    username = fixtures["customers"][number % len(fixtures["customers"])]
+    token = None
+
+    async def call(step, method, path, data=None):
+        await limiter.acquire()
+        status, content, elapsed = await loop.run_in_executor(
+            executor, send_request, base_url, method, path, token, data
+        )
+        report.record(step, status, elapsed)
+        return status, content
+
+    while time.monotonic() < deadline:
+        if token is None:
+            status, content = await call(
+                "login",
+                "POST",
+                "/api/login/",
+                {"username": username, "password": BENCHMARK_PASSWORD},
+            )
+            token = read_token(content) if status == 200 else None
+            if token is None:
+                await asyncio.sleep(1)
+                continue
+        for step, method, path, data in build_journey(rng, fixtures, username):
+            if time.monotonic() >= deadline:
+                break
+            await call(step, method, path, data)
+
+
+async def run_load_test(
+    base_url, fixtures, users=10, rate=20.0, duration=30.0, server_log=None
+):
+    """
+    Runs ``users`` virtual users against the server for ``duration`` seconds
+    while keeping the combined request rate at ``rate`` per second. Lock
+    errors are only reported when ``server_log`` returns the server's log
+    lines; every 5xx counts as an error either way.
+    """
+    report = LoadTestReport()
+    limiter = RateLimiter(rate)
+    deadline = time.monotonic() + duration
+    with ThreadPoolExecutor(max_workers=users) as executor:
+        await asyncio.gather(
+            *(
+                run_virtual_user(
+                    number, base_url, fixtures, limiter, report, deadline, executor
+                )
+                for number in range(users)
+            )
+        )
+    report.finish()
+    if server_log is not None:
+        report.add_server_log(server_log())
+    return report.summary(rate)
+
+
+def start_server(port, workers=2, log_file=None):
+    """
+    Starts gunicorn with the project settings on localhost. The request log
+    goes to ``log_file`` so lock errors can be counted afterwards.
+    """
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "Coder.wsgi:application",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=log_file or subprocess.DEVNULL,
+    )
+
+
+def wait_for_server(base_url, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status, _, _ = send_request(base_url, "GET", "/api/base-info/", timeout=2)
+        if status:
+            return True
+        time.sleep(0.2)
+    return False
+
+
+# End of loadTest_logic.py
@@ -0,0 +1,351 @@
+import atexit
+import bisect
+import hmac
+import ipaddress
+import json
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+# metrics_logic.py
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FILE_PREFIX = "metrics-"
+HTTP_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+METRIC_FAMILIES = {
+    "coderr_http_requests_total": (
+        "counter",
+        "HTTP requests by URL name, method and status.",
+    ),
+    "coderr_http_request_duration_seconds": (
+        "histogram",
+        "Time spent handling a request, by URL name.",
+    ),
+    "coderr_db_queries_total": ("counter", "Database queries by URL name."),
+    "coderr_db_query_duration_seconds_total": (
+        "counter",
+        "Time spent in database queries, by URL name.",
+    ),
+    "coderr_throttled_requests_total": (
+        "counter",
+        "Requests rejected by throttling, by URL name.",
+    ),
+    "coderr_cache_requests_total": ("counter", "Cache lookups by cache and result."),
+    "coderr_cache_hit_ratio": ("gauge", "Share of cache lookups that were hits."),
+    "coderr_process_resident_memory_bytes": (
+        "gauge",
+        "Resident memory of each live worker process.",
+    ),
+}
+
+
+def get_metrics_options():
+    """
+    Without a DIRECTORY nothing is written; each process keeps its values
+    in memory and /metrics only shows the worker that answers.
+    """
+    options = getattr(settings, "METRICS", {})
+    directory = options.get("DIRECTORY")
+    return {
+        "directory": Path(directory) if directory else None,
+        "flush_interval": options.get("FLUSH_INTERVAL", 5),
+        "token": options.get("TOKEN"),
+    }
+
+
+def get_resident_memory():
+    """
+    Returns the current RSS in bytes, falling back to the peak RSS where
+    /proc is not available.
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class MetricsStore:
+    """
+    Counters and histograms of one process. The values are written to a
+    per-process file, so the /metrics view of any worker can add up all of
+    them without a metrics server.
+    """
+
+    def __init__(self, directory, flush_interval=5):
+        self.pid = os.getpid()
+        self.directory = Path(directory) if directory else None
+        self.flush_interval = flush_interval
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+
+    @property
+    def path(self):
+        return self.directory / f"{FILE_PREFIX}{self.pid}.json"
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            buckets, total, count = self.histograms.get(
+                key, ([0] * (len(LATENCY_BUCKETS) + 1), 0.0, 0)
+            )
+            buckets[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+            self.histograms[key] = (buckets, total + value, count + 1)
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "pid": self.pid,
+                "rss": get_resident_memory(),
+                "counters": [
+                    [name, dict(labels), value]
+                    for (name, labels), value in self.counters.items()
+                ],
+                "histograms": [
+                    [name, dict(labels), list(buckets), total, count]
+                    for (name, labels), (buckets, total, count) in self.histograms.items()
+                ],
+            }
+
+    def flush(self):
+        """
+        Writes the process state atomically through a temporary file.
+        """
+        if self.directory is None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, self.path)
+        self.last_flush = time.monotonic()
+
+    def safe_flush(self):
+        """
+        Flushes without raising; a full or unwritable directory only makes
+        the values of this process stale.
+        """
+        try:
+            self.flush()
+        except OSError:
+            pass
+
+    def maybe_flush(self):
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.safe_flush()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_metrics_store():
+    """
+    Returns the store of the current process; forked workers get their own.
+    """
+    global _store
+    if _store is None or _store.pid != os.getpid():
+        with _store_lock:
+            if _store is None or _store.pid != os.getpid():
+                options = get_metrics_options()
+                _store = MetricsStore(options["directory"], options["flush_interval"])
+    return _store
+
+
+def flush_on_exit():
+    """
+    Writes the last values of an exiting worker. Stores inherited through
+    fork belong to the parent and are left alone.
+    """
+    if _store is not None and _store.pid == os.getpid():
+        _store.safe_flush()
+
+
+atexit.register(flush_on_exit)
+
+
+@receiver(setting_changed)
+def reset_metrics_store(setting, **kwargs):
+    """
+    Drops the store when METRICS changes, so values recorded under one
+    directory are never flushed into another.
+    """
+    global _store
+    if setting == "METRICS":
+        with _store_lock:
+            _store = None
+
+
+def observe_request(view, method, status, duration, queries, db_time):
+    store = get_metrics_store()
+    view = view or "unmatched"
+    # The method comes from the client; unknown verbs share one series.
+    method = method if method in HTTP_METHODS else "other"
+    store.inc("coderr_http_requests_total", view=view, method=method, status=str(status))
+    store.observe("coderr_http_request_duration_seconds", duration, view=view)
+    store.inc("coderr_db_queries_total", queries, view=view)
+    store.inc("coderr_db_query_duration_seconds_total", db_time, view=view)
+    if status == 429:
+        store.inc("coderr_throttled_requests_total", view=view)
+    store.maybe_flush()
+
+
+def record_cache_lookup(cache, hit):
+    get_metrics_store().inc(
+        "coderr_cache_requests_total", cache=cache, result="hit" if hit else "miss"
+    )
+
+
+def is_process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def read_snapshots(directory):
+    for path in Path(directory).glob(f"{FILE_PREFIX}*.json"):
+        try:
+            yield json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+
+
+def merge_snapshots(snapshots):
+    """
+    Adds up the snapshots of all processes. Counters of exited workers are
+    kept so totals never go backwards; memory is only reported for live ones.
+    """
+    counters = defaultdict(float)
+    histograms = {}
+    memory = {}
+    for data in snapshots:
+        for name, labels, value in data["counters"]:
+            counters[(name, tuple(sorted(labels.items())))] += value
+        for name, labels, buckets, total, count in data["histograms"]:
+            key = (name, tuple(sorted(labels.items())))
+            merged, merged_total, merged_count = histograms.get(
+                key, ([0] * len(buckets), 0.0, 0)
+            )
+            histograms[key] = (
+                [a + b for a, b in zip(merged, buckets)],
+                merged_total + total,
+                merged_count + count,
+            )
+        if is_process_alive(data["pid"]):
+            memory[data["pid"]] = data["rss"]
+    return counters, histograms, memory
+
+
+def collect_metrics(directory):
+    return merge_snapshots(read_snapshots(directory))
+
+
+def collect_store_metrics(store):
+    """
+    Values of every worker when the store writes files, otherwise only
+    those of the current process.
+    """
+    if store.directory is None:
+        return merge_snapshots([store.snapshot()])
+    store.safe_flush()
+    return collect_metrics(store.directory)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def format_value(value):
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def get_cache_hit_ratios(counters):
+    lookups = defaultdict(lambda: {"hit": 0.0, "miss": 0.0})
+    for (name, labels), value in counters.items():
+        if name == "coderr_cache_requests_total":
+            labels = dict(labels)
+            lookups[labels["cache"]][labels["result"]] += value
+    return {
+        (("cache", cache),): counts["hit"] / (counts["hit"] + counts["miss"])
+        for cache, counts in lookups.items()
+        if counts["hit"] + counts["miss"]
+    }
+
+
+def render_metrics(counters, histograms, memory):
+    """
+    Renders the collected values in the Prometheus text exposition format.
+    """
+    samples = defaultdict(list)
+    for (name, labels), value in sorted(counters.items()):
+        samples[name].append(f"{name}{format_labels(labels)} {format_value(value)}")
+    for (name, labels), (buckets, total, count) in sorted(histograms.items()):
+        cumulative = 0
+        for bound, bucket in zip((*LATENCY_BUCKETS, "+Inf"), buckets):
+            cumulative += bucket
+            bucket_labels = (*labels, ("le", str(bound)))
+            samples[name].append(f"{name}_bucket{format_labels(bucket_labels)} {cumulative}")
+        samples[name].append(f"{name}_sum{format_labels(labels)} {format_value(total)}")
+        samples[name].append(f"{name}_count{format_labels(labels)} {count}")
+    for labels, ratio in sorted(get_cache_hit_ratios(counters).items()):
+        samples["coderr_cache_hit_ratio"].append(
+            f"coderr_cache_hit_ratio{format_labels(labels)} {round(ratio, 4)}"
+        )
+    for pid, rss in sorted(memory.items()):
+        samples["coderr_process_resident_memory_bytes"].append(
+            f'coderr_process_resident_memory_bytes{{pid="{pid}"}} {rss}'
+        )
+
+    lines = []
+    for name, (metric_type, help_text) in METRIC_FAMILIES.items():
+        if not samples[name]:
+            continue
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(samples[name])
+    return "\n".join(lines) + "\n"
+
+
+def is_metrics_request_allowed(request, token):
+    """
+    With a token configured the scraper must send it as a bearer token.
+    Without one, only direct loopback requests are served; requests that
+    came through nginx carry X-Forwarded-For and are refused.
+    """
+    if token:
+        supplied = request.headers.get("Authorization", "")
+        return hmac.compare_digest(supplied, f"Bearer {token}")
+    if "X-Forwarded-For" in request.headers:
+        return False
+    try:
+        return ipaddress.ip_address(request.META.get("REMOTE_ADDR", "")).is_loopback
+    except ValueError:
+        return False
+
+
+# End of metrics_logic.py
@@ -0,0 +1,185 @@
+import hmac
+import json
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import OperationalError, connections
+
+from utils.metrics import observe_request
+from utils.slow_queries import get_slow_query_threshold, record_slow_queries
+
+
+# requestMetrics_logic.py
+logger = logging.getLogger("coder_app.requests")
+DEBUG_TOKEN_HEADER = "X-Debug-Token"
+SQLITE_LOCK_MESSAGE = "database is locked"
+
+_current_metrics = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    """
+    Query count, database time and serializer time of one request.
+    """
+
+    def __init__(self, slow_threshold=None):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.lock_errors = 0
+        self.slow_threshold = slow_threshold
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Database execute wrapper: counts and times every query, keeps the
+        ones above the slow-query threshold and counts SQLite lock errors,
+        which views may turn into plain 500 responses.
+        """
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        except OperationalError as error:
+            if SQLITE_LOCK_MESSAGE in str(error):
+                self.lock_errors += 1
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self.db_time += duration
+            self.queries += 1
+            if self.slow_threshold is not None and duration >= self.slow_threshold:
+                self.slow_queries.append(
+                    (context["connection"].alias, sql, params, many, duration * 1000)
+                )
+
+
+def get_request_metrics():
+    return _current_metrics.get()
+
+
+@contextmanager
+def serializer_timer():
+    """
+    Adds the time spent in the block to the serializer time of the current
+    request. Nested blocks are counted once.
+    """
+    metrics = get_request_metrics()
+    if metrics is None or metrics.serializing:
+        yield
+        return
+    metrics.serializing = True
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializing = False
+
+
+class SerializerTimingMixin:
+    """
+    Reports the time spent in to_representation as serializer time.
+    """
+
+    def to_representation(self, instance):
+        with serializer_timer():
+            return super().to_representation(instance)
+
+
+def is_timing_visible(request):
+    """
+    Server-Timing is only sent to staff users, in DEBUG, or when the request
+    carries the configured debug token.
+    """
+    if settings.DEBUG:
+        return True
+    token = getattr(settings, "REQUEST_METRICS", {}).get("DEBUG_TOKEN")
+    supplied = request.headers.get(DEBUG_TOKEN_HEADER)
+    if token and supplied and hmac.compare_digest(token, supplied):
+        return True
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_staff)
+
+
+def build_server_timing(metrics, total):
+    return ", ".join(
+        [
+            f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} queries"',
+            f"serializer;dur={metrics.serializer_time * 1000:.2f}",
+            f"view;dur={total * 1000:.2f}",
+        ]
+    )
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, database time, serializer time and total view time
+    for each request. Logs one JSON line per request, keyed by the URL name,
+    feeds the /metrics counters and adds a Server-Timing header for
+    permitted clients.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics(get_slow_query_threshold())
+        reset_token = _current_metrics.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current_metrics.reset(reset_token)
+        total = time.perf_counter() - start
+
+        if is_timing_visible(request):
+            response["Server-Timing"] = build_server_timing(metrics, total)
+        self.log(request, response, metrics, total)
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        observe_request(
+            view_name,
+            request.method,
+            response.status_code,
+            total,
+            metrics.queries,
+            metrics.db_time,
+        )
+        if metrics.slow_queries:
+            record_slow_queries(metrics.slow_queries, view_name)
+        return response
+
+    def log(self, request, response, metrics, total):
+        """
+        Requests that hit a locked database are logged as warnings, so they
+        stay visible when the level hides the regular lines.
+        """
+        level = logging.WARNING if metrics.lock_errors else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        match = request.resolver_match
+        logger.log(
+            level,
+            json.dumps(
+                {
+                    "url_name": match.view_name if match else None,
+                    "method": request.method,
+                    "status": response.status_code,
+                    "queries": metrics.queries,
+                    "db_ms": round(metrics.db_time * 1000, 2),
+                    "serializer_ms": round(metrics.serializer_time * 1000, 2),
+                    "view_ms": round(total * 1000, 2),
+                    "db_locked": metrics.lock_errors,
+                }
+            )
+        )
+
+
+# End of requestMetrics_logic.py
@@ -2,6 +2,7 @@ from coder_app.models import CustomerProfile, BusinessProfile
 from rest_framework.exceptions import ValidationError
 from django.contrib.auth.models import User
 from django.utils.timezone import now
+from utils.utils import get_profile, get_profile_type
 
 
 # serializers
@@ -12,28 +13,17 @@ def get_user_type(obj):
     """
     Returns the type of the user: superuser, business, customer, or unknown.
     """
-    if hasattr(obj, "business_profile"):
-        return "business"
-    elif hasattr(obj, "customer_profile"):
-        return "customer"
-    return "unknown"
+    return get_profile_type(obj) or "unknown"
 
 
 def get_user_profile_image(obj):
     """
     Returns the URL of the profile image based on the user's profile type.
     """
-    if hasattr(obj, "business_profile") and getattr(obj.business_profile, "file", None):
-        try:
-            return obj.business_profile.file.url 
-        except AttributeError:
-            return None
-    if hasattr(obj, "customer_profile") and getattr(obj.customer_profile, "file", None):
-        try:
-            return obj.customer_profile.file.url  
-        except AttributeError:
-            return None
-    return None
+    profile = get_profile(obj)
+    if profile is None or not profile.file:
+        return None
+    return profile.file.url
 
 
 # End of userProfileSerializers_logic.py
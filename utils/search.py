@@ -0,0 +1,224 @@
+import re
+
+from django.db import connections, models
+from django.db.models import BooleanField, F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+
+# offerSearch_logic.py
+SQLITE_TABLE = "coder_app_offer_search"
+POSTGRES_INDEX = "coder_app_offer_search_idx"
+POSTGRES_VECTOR = (
+    "to_tsvector('simple', coalesce(coder_app_offer.title, '') || ' ' || "
+    "coalesce(coder_app_offer.description, ''))"
+)
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+SQLITE_SETUP = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_TABLE} USING fts5(
+        title, description,
+        content='coder_app_offer', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_ai AFTER INSERT ON coder_app_offer
+    BEGIN
+        INSERT INTO {SQLITE_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_ad AFTER DELETE ON coder_app_offer
+    BEGIN
+        INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SQLITE_TABLE}_au
+    AFTER UPDATE OF title, description ON coder_app_offer
+    BEGIN
+        INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {SQLITE_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}, rank) VALUES ('rank', 'bm25(10.0, 1.0)')",
+]
+SQLITE_TEARDOWN = [
+    f"DROP TRIGGER IF EXISTS {SQLITE_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SQLITE_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SQLITE_TABLE}_au",
+    f"DROP TABLE IF EXISTS {SQLITE_TABLE}",
+]
+
+_available_backends = {}
+
+
+class SearchMatchField(models.TextField):
+    """
+    Hidden FTS5 column named after its table, used as the left side of MATCH.
+    """
+
+
+@SearchMatchField.register_lookup
+class Match(models.Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+def sqlite_supports_fts5(connection):
+    """
+    Checks whether the SQLite library was compiled with FTS5.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("PRAGMA compile_options")
+        return any(row[0] == "ENABLE_FTS5" for row in cursor.fetchall())
+
+
+def install_search_index(connection):
+    """
+    Creates the full-text index for offers and fills it from existing rows.
+    Safe to run repeatedly; returns False when the database has no support.
+    """
+    if connection.vendor == "sqlite":
+        if not sqlite_supports_fts5(connection):
+            return False
+        with connection.cursor() as cursor:
+            for statement in SQLITE_SETUP:
+                cursor.execute(statement)
+    elif connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {POSTGRES_INDEX} "
+                f"ON coder_app_offer USING GIN ({POSTGRES_VECTOR})"
+            )
+    else:
+        return False
+    _available_backends.clear()
+    return rebuild_search_index(connection)
+
+
+def rebuild_search_index(connection):
+    """
+    Rebuilds the full-text index from the offer table.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(
+                f"INSERT INTO {SQLITE_TABLE}({SQLITE_TABLE}) VALUES ('rebuild')"
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(f"REINDEX INDEX {POSTGRES_INDEX}")
+        else:
+            return False
+    return True
+
+
+def uninstall_search_index(connection):
+    """
+    Drops the full-text index for offers.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            for statement in SQLITE_TEARDOWN:
+                cursor.execute(statement)
+        elif connection.vendor == "postgresql":
+            cursor.execute(f"DROP INDEX IF EXISTS {POSTGRES_INDEX}")
+    _available_backends.clear()
+
+
+def ensure_search_index(using="default", **kwargs):
+    """
+    post_migrate hook: SQLite drops the triggers when a migration rebuilds the
+    offer table, so they are recreated and the index refilled when missing.
+    """
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    if SQLITE_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN "
+            "(%s, %s, %s)",
+            [f"{SQLITE_TABLE}_ai", f"{SQLITE_TABLE}_ad", f"{SQLITE_TABLE}_au"],
+        )
+        trigger_count = cursor.fetchone()[0]
+    if trigger_count < 3:
+        install_search_index(connection)
+
+
+def get_search_backend(using="default"):
+    """
+    Returns "sqlite", "postgresql" or None when only LIKE scans are possible.
+    The lookup is cached per connection alias and database name.
+    """
+    connection = connections[using]
+    key = (using, str(connection.settings_dict["NAME"]))
+    if key not in _available_backends:
+        backend = None
+        if connection.vendor == "postgresql":
+            backend = "postgresql"
+        elif connection.vendor == "sqlite":
+            if SQLITE_TABLE in connection.introspection.table_names():
+                backend = "sqlite"
+        _available_backends[key] = backend
+    return _available_backends[key]
+
+
+def build_sqlite_query(value):
+    """
+    Turns user input into an FTS5 query with prefix matching on every word.
+    """
+    return " ".join(f'"{token}"*' for token in TOKEN_PATTERN.findall(value.lower()))
+
+
+def build_postgres_query(value):
+    """
+    Turns user input into a tsquery with prefix matching on every word.
+    """
+    return " & ".join(f"{token}:*" for token in TOKEN_PATTERN.findall(value.lower()))
+
+
+def search_offers(queryset, value):
+    """
+    Filters offers by full-text search and annotates ``search_rank``
+    (lower is more relevant). Falls back to icontains when no index exists.
+    """
+    backend = get_search_backend(queryset.db)
+    if backend == "sqlite":
+        query = build_sqlite_query(value)
+        if not query:
+            return queryset
+        return queryset.filter(search_index__document__match=query).annotate(
+            search_rank=F("search_index__rank")
+        )
+    if backend == "postgresql":
+        query = build_postgres_query(value)
+        if not query:
+            return queryset
+        return queryset.filter(
+            RawSQL(
+                f"{POSTGRES_VECTOR} @@ to_tsquery('simple', %s)",
+                [query],
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"-ts_rank({POSTGRES_VECTOR}, to_tsquery('simple', %s))",
+                [query],
+                output_field=FloatField(),
+            )
+        )
+    return queryset.filter(Q(title__icontains=value) | Q(description__icontains=value))
+
+
+# End of offerSearch_logic.py
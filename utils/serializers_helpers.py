@@ -1,22 +1,45 @@
 from rest_framework import serializers
 from django.db.models import Min
 from decimal import Decimal
-from coder_app.models import Order, Review, OfferDetail
-from django.db.models import Avg
+from coder_app.models import Order, OfferDetail
+from utils.utils import (
+    OFFER_DETAIL_FIELDS,
+    apply_offer_detail_data,
+    build_offer_detail,
+    get_business_stats,
+    has_profile,
+    save_offer_details,
+    snapshot_offer_detail,
+)
 
 
 # offerSerializer_logic.py
+def get_min_detail_value(offer, annotation, field):
+    """Liest ein vorberechnetes Minimum der OfferDetails, ohne unnötige Queries."""
+    if annotation in offer.__dict__:
+        return offer.__dict__[annotation]
+
+    prefetched = getattr(offer, "_prefetched_objects_cache", {})
+    if "details" in prefetched:
+        values = [
+            getattr(detail, field)
+            for detail in prefetched["details"]
+            if getattr(detail, field) is not None
+        ]
+        return min(values, default=None)
+
+    return offer.details.aggregate(value=Min(field))["value"]
+
+
 def calculate_min_price(offer):
     """Berechnet den minimalen Preis für ein Angebot."""
-    min_price = offer.details.aggregate(min_price=Min("variant_price"))["min_price"]
+    min_price = get_min_detail_value(offer, "min_price", "variant_price")
     return float(Decimal(min_price).quantize(Decimal("0.00"))) if min_price else None
 
 
 def calculate_min_delivery_time(offer):
     """Berechnet die minimale Lieferzeit für ein Angebot."""
-    return offer.details.aggregate(min_delivery_time=Min("delivery_time_in_days"))[
-        "min_delivery_time"
-    ]
+    return get_min_detail_value(offer, "min_delivery_time", "delivery_time_in_days")
 
 
 def extract_user_details(obj):
@@ -30,34 +53,18 @@ def extract_user_details(obj):
 
 
 def create_offer_details(offer, details_data):
-    """Erstellt die OfferDetails für ein Angebot."""
-    from coder_app.models import OfferDetail
-
+    """Erstellt alle OfferDetails eines Angebots mit einem INSERT."""
     if not details_data:
         raise ValueError("Details data cannot be empty.")
 
     for detail_data in details_data:
-        required_fields = [
-            "title",
-            "price",
-            "revisions",
-            "delivery_time_in_days",
-            "features",
-            "offer_type",
-        ]
-        for field in required_fields:
+        for field in OFFER_DETAIL_FIELDS:
             if field not in detail_data:
                 raise ValueError(f"Missing required field: {field}")
 
-        OfferDetail.objects.create(
-            offer=offer,
-            variant_title=detail_data["title"],
-            variant_price=detail_data["price"],
-            revision_limit=detail_data["revisions"],
-            delivery_time_in_days=detail_data["delivery_time_in_days"],
-            features=detail_data["features"],
-            offer_type=detail_data["offer_type"],
-        )
+    save_offer_details(
+        offer, created=[build_offer_detail(offer, data) for data in details_data]
+    )
 
 
 def update_main_instance(instance, validated_data):
@@ -72,38 +79,25 @@ def update_main_instance(instance, validated_data):
 
 
 def update_offer_details(instance, details_data):
-    """Aktualisiert die OfferDetails eines Angebots."""
-    from coder_app.models import OfferDetail
-
+    """Aktualisiert die OfferDetails eines Angebots gesammelt per Bulk-Query."""
     if not details_data:
         return
 
     existing_details = {detail.offer_type: detail for detail in instance.details.all()}
-    updated_offer_types = set()
+    created, updated = [], {}
 
     for detail_data in details_data:
-        offer_type = detail_data.get("offer_type")
-        if offer_type in existing_details:
-            detail_instance = existing_details[offer_type]
-            for attr, value in detail_data.items():
-                setattr(detail_instance, attr, value)
-            detail_instance.save()
-            updated_offer_types.add(offer_type)
+        detail_instance = existing_details.get(detail_data.get("offer_type"))
+        if detail_instance:
+            apply_offer_detail_data(detail_instance, detail_data)
+            updated[detail_instance.id] = detail_instance
         else:
-            OfferDetail.objects.create(
-                offer=instance,
-                variant_title=detail_data["title"],
-                variant_price=detail_data["price"],
-                revision_limit=detail_data["revisions"],
-                delivery_time_in_days=detail_data["delivery_time_in_days"],
-                features=detail_data["features"],
-                offer_type=offer_type,
-            )
-            updated_offer_types.add(offer_type)
-
-    for offer_type, detail_instance in existing_details.items():
-        if offer_type not in updated_offer_types:
-            detail_instance.delete()
+            created.append(build_offer_detail(instance, detail_data))
+
+    deleted_ids = [
+        detail.id for detail in existing_details.values() if detail.id not in updated
+    ]
+    save_offer_details(instance, created, list(updated.values()), deleted_ids)
 
 
 # End of offerSerializers_logic.py
@@ -111,16 +105,14 @@ def update_offer_details(instance, details_data):
 
 # businessProfilSerializer_logic.py
 def calculate_avg_rating(obj):
-    avg = Review.objects.filter(business_user=obj.user).aggregate(Avg("rating"))[
-        "rating__avg"
-    ]
+    """Liest die Durchschnittsbewertung aus den gepflegten BusinessStats."""
+    avg = get_business_stats(obj.user).average_rating
     return round(avg, 1) if avg else "-"
 
 
 def count_pending_orders(obj):
-    return Order.objects.filter(
-        business_user=obj.user, status__in=["in_progress"]
-    ).count()
+    """Liest die Anzahl laufender Bestellungen aus den BusinessStats."""
+    return get_business_stats(obj.user).in_progress_orders
 
 
 def update_instance_fields(instance, validated_data):
@@ -167,7 +159,7 @@ def validate_order_data(user, data):
     Validates the data to ensure only customers can create orders
     and that the provided OfferDetail is valid.
     """
-    if hasattr(user, "business_profile"):
+    if has_profile(user, "business"):
         raise serializers.ValidationError("Business profiles cannot create orders.")
 
     offer_detail = data.get("offer_detail")
@@ -186,9 +178,7 @@ def create_order_with_details(validated_data):
     Creates a new order with the validated data.
     """
     offer_detail = validated_data.get("offer_detail")
-    validated_data["offer"] = offer_detail.offer
-    validated_data["features"] = offer_detail.features or []
-    validated_data["business_user"] = offer_detail.offer.user
+    validated_data.update(snapshot_offer_detail(offer_detail))
     return Order.objects.create(**validated_data)
 
 
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.core.signals import request_finished
+from django.db import DatabaseError, IntegrityError, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from coder_app.models import SlowQuery
+
+
+# slowQueryLog_logic.py
+logger = logging.getLogger("coder_app.slow_queries")
+EXPLAINABLE = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)")
+WHITESPACE = re.compile(r"\s+")
+SENSITIVE_SQL = re.compile(r'authtoken_token|"password"', re.IGNORECASE)
+
+
+def get_slow_query_threshold():
+    """
+    Returns the threshold in seconds, or None when the log is disabled.
+    """
+    threshold = getattr(settings, "SLOW_QUERY_LOG", {}).get("THRESHOLD_MS")
+    return None if threshold is None else threshold / 1000
+
+
+def normalize_sql(sql):
+    """
+    Replaces literals with placeholders and collapses IN lists, so the same
+    statement with different values shares one fingerprint.
+    """
+    sql = STRING_LITERAL.sub("?", sql)
+    sql = NUMBER_LITERAL.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    sql = PLACEHOLDER_LIST.sub("(...)", sql)
+    return WHITESPACE.sub(" ", sql).strip()
+
+
+def fingerprint_sql(sql):
+    return hashlib.sha1(normalize_sql(sql).encode()).hexdigest()
+
+
+def explain_query(connection, sql, params, many=False):
+    """
+    Returns EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL) output, or
+    an empty string for statements that cannot be explained.
+    """
+    if many or not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return ""
+    if connection.vendor == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif connection.vendor == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return ""
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql, params)
+        rows = cursor.fetchall()
+    if connection.vendor == "sqlite":
+        return "\n".join(row[-1] for row in rows)
+    return "\n".join(row[0] for row in rows)
+
+
+def get_slow_query_options():
+    options = getattr(settings, "SLOW_QUERY_LOG", {})
+    return {
+        "capture_params": options.get("CAPTURE_PARAMS", False),
+        "record_interval": options.get("RECORD_INTERVAL", 60),
+    }
+
+
+def format_params(sql, params):
+    """
+    Bind parameters are only kept when CAPTURE_PARAMS is on, and never for
+    statements that touch tokens or password hashes.
+    """
+    if not get_slow_query_options()["capture_params"] or SENSITIVE_SQL.search(sql):
+        return ""
+    try:
+        return json.dumps(params, default=str)[:2000]
+    except TypeError:
+        return repr(params)[:2000]
+
+
+class PendingSlowQuery:
+    """
+    Slow executions of one fingerprint not yet written to the database. The
+    statement and parameters of the slowest execution are kept for EXPLAIN.
+    """
+
+    def __init__(self, alias, sql, params, many, view_name):
+        self.alias = alias
+        self.sql = sql
+        self.params = params
+        self.many = many
+        self.view_name = view_name
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, alias, sql, params, many, duration_ms, view_name):
+        if duration_ms > self.max_ms:
+            self.alias, self.sql, self.params, self.many = alias, sql, params, many
+            self.max_ms = duration_ms
+        self.view_name = view_name
+        self.count += 1
+        self.total_ms += duration_ms
+
+
+class SlowQueryBuffer:
+    """
+    Collects slow queries in memory and writes each fingerprint at most once
+    per RECORD_INTERVAL, so slow requests under write contention do not add
+    an EXPLAIN and a write per query.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self.last_recorded = {}
+        self.lock = threading.Lock()
+
+    def add(self, alias, sql, params, many, duration_ms, view_name):
+        fingerprint = fingerprint_sql(sql)
+        with self.lock:
+            entry = self.pending.get(fingerprint)
+            if entry is None:
+                entry = self.pending[fingerprint] = PendingSlowQuery(
+                    alias, sql, params, many, view_name
+                )
+            entry.add(alias, sql, params, many, duration_ms, view_name)
+
+    def take_due(self, force=False):
+        interval = get_slow_query_options()["record_interval"]
+        now = time.monotonic()
+        with self.lock:
+            due = [
+                fingerprint
+                for fingerprint in self.pending
+                if force
+                or now - self.last_recorded.get(fingerprint, float("-inf")) >= interval
+            ]
+            for fingerprint in due:
+                self.last_recorded[fingerprint] = now
+            return [(fingerprint, self.pending.pop(fingerprint)) for fingerprint in due]
+
+
+slow_query_buffer = SlowQueryBuffer()
+
+
+def record_slow_query(fingerprint, entry):
+    """
+    Adds buffered executions to the aggregate row of their fingerprint. The
+    plan is captured for new fingerprints and whenever a query sets a new
+    maximum duration.
+    """
+    connection = connections[entry.alias]
+    existing = (
+        SlowQuery.objects.filter(fingerprint=fingerprint).values("max_ms").first()
+    )
+    plan = None
+    if existing is None or entry.max_ms > existing["max_ms"]:
+        plan = explain_query(connection, entry.sql, entry.params, entry.many)
+
+    params = format_params(entry.sql, entry.params)
+    changes = {
+        "count": F("count") + entry.count,
+        "total_ms": F("total_ms") + entry.total_ms,
+        "max_ms": Greatest(F("max_ms"), entry.max_ms),
+        "view_name": entry.view_name,
+        "last_seen": timezone.now(),
+    }
+    if plan is not None:
+        changes.update(sql=entry.sql, params=params, plan=plan)
+    if not SlowQuery.objects.filter(fingerprint=fingerprint).update(**changes):
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=fingerprint,
+                    sql=entry.sql,
+                    params=params,
+                    view_name=entry.view_name,
+                    plan=plan or "",
+                    count=entry.count,
+                    total_ms=entry.total_ms,
+                    max_ms=entry.max_ms,
+                )
+        except IntegrityError:
+            SlowQuery.objects.filter(fingerprint=fingerprint).update(**changes)
+
+    logger.warning(
+        json.dumps(
+            {
+                "fingerprint": fingerprint,
+                "view_name": entry.view_name,
+                "count": entry.count,
+                "max_ms": round(entry.max_ms, 2),
+                "sql": entry.sql,
+                "params": params,
+                "plan": plan,
+            }
+        )
+    )
+
+
+def record_slow_queries(slow_queries, view_name):
+    """
+    Buffers the slow queries collected during a request. They are written
+    by flush_slow_queries once the response has been sent.
+    """
+    for alias, sql, params, many, duration_ms in slow_queries:
+        slow_query_buffer.add(alias, sql, params, many, duration_ms, view_name or "")
+
+
+def flush_slow_queries(force=False, **kwargs):
+    """
+    request_finished receiver: writes the fingerprints whose interval has
+    passed. Failures are logged and never affect a response. Executions
+    still buffered when a worker exits are lost.
+    """
+    for fingerprint, entry in slow_query_buffer.take_due(force):
+        try:
+            record_slow_query(fingerprint, entry)
+        except DatabaseError:
+            logger.exception("Could not record slow query %s", entry.sql[:200])
+
+
+def enable_slow_query_log():
+    request_finished.connect(
+        flush_slow_queries, dispatch_uid="coder_app.flush_slow_queries"
+    )
+
+
+def get_slow_query_report(order_by="total", limit=20):
+    ordering = {"total": "-total_ms", "count": "-count", "max": "-max_ms"}
+    return SlowQuery.objects.order_by(ordering.get(order_by, "-total_ms"))[:limit]
+
+
+# End of slowQueryLog_logic.py
@@ -0,0 +1,40 @@
+import tempfile
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+# testRunner_logic.py
+TEST_RESPONSE_CACHE = {
+    "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    "LOCATION": "coderr-test-responses",
+}
+
+
+class IsolatedTestRunner(DiscoverRunner):
+    """
+    Runs the suite against an in-process response cache and a per-run
+    metrics directory, so a test run on a deployed host never touches the
+    live server's shared file cache or the files behind its /metrics.
+    """
+
+    def get_isolated_settings(self):
+        return {
+            "CACHES": {**settings.CACHES, "responses": TEST_RESPONSE_CACHE},
+            "METRICS": {**settings.METRICS, "DIRECTORY": self.metrics_directory.name},
+        }
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.metrics_directory = tempfile.TemporaryDirectory(prefix="coderr-test-metrics-")
+        self.isolated_settings = override_settings(**self.get_isolated_settings())
+        self.isolated_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.isolated_settings.disable()
+        self.metrics_directory.cleanup()
+        super().teardown_test_environment(**kwargs)
+
+
+# End of testRunner_logic.py
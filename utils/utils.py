@@ -1,6 +1,11 @@
 from django.contrib.auth import authenticate
 from rest_framework.authtoken.models import Token
 from rest_framework.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, F, Min, OuterRef, Subquery, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from utils.cache import bump_offer_cache_version
 
 
 # viesw.py
@@ -26,6 +31,62 @@ def authenticate_user(username, password):
 # End of loginView_logic.py
 
 
+# profileType_logic.py
+PROFILE_RELATIONS = {"business": "business_profile", "customer": "customer_profile"}
+
+
+def resolve_profiles(user):
+    """
+    Loads both profile relations of the user in one query and remembers
+    which profile types exist, so later checks need no reverse lookups.
+    """
+    if "_profile_types" in user.__dict__:
+        return user._profile_types
+    if not getattr(user, "pk", None):
+        user._profile_types = frozenset()
+        return user._profile_types
+
+    fields_cache = user._state.fields_cache
+    if not all(relation in fields_cache for relation in PROFILE_RELATIONS.values()):
+        loaded = (
+            type(user)
+            .objects.select_related(*PROFILE_RELATIONS.values())
+            .get(pk=user.pk)
+        )
+        for relation in PROFILE_RELATIONS.values():
+            fields_cache[relation] = loaded._state.fields_cache.get(relation)
+
+    user._profile_types = frozenset(
+        profile_type
+        for profile_type, relation in PROFILE_RELATIONS.items()
+        if fields_cache.get(relation) is not None
+    )
+    return user._profile_types
+
+
+def has_profile(user, profile_type):
+    return profile_type in resolve_profiles(user)
+
+
+def get_profile_type(user):
+    """
+    Returns "business", "customer" or None; business wins if both exist.
+    """
+    profile_types = resolve_profiles(user)
+    return next((t for t in PROFILE_RELATIONS if t in profile_types), None)
+
+
+def get_profile(user):
+    """
+    Returns the user's profile row, or None when there is none.
+    """
+    profile_type = get_profile_type(user)
+    return getattr(user, PROFILE_RELATIONS[profile_type]) if profile_type else None
+
+
+# End of profileType_logic.py
+
+
 # model.py
 #  order_logic.py
 def set_order_defaults(order):
@@ -48,4 +109,229 @@ def set_order_defaults(order):
         order.delivery_time_in_days = order.offer_detail.delivery_time_in_days
 
 
+def snapshot_offer_detail(offer_detail):
+    """
+    Returns the offer detail values an order keeps, so later edits of the
+    offer never change existing orders and order lists need no joins.
+    """
+    return {
+        "offer": offer_detail.offer,
+        "business_user": offer_detail.offer.user,
+        "title": offer_detail.offer.title,
+        "revisions": offer_detail.revision_limit or 0,
+        "delivery_time_in_days": offer_detail.delivery_time_in_days,
+        "price": offer_detail.variant_price,
+        "features": offer_detail.features or [],
+        "offer_type": offer_detail.offer_type,
+    }
+
+
 # End of order_logic.py
+
+
+# offer_logic.py
+def sync_offer_min_values(offer):
+    """
+    Stores the lowest detail price and delivery time on the offer itself
+    and marks the offer as modified.
+    """
+    values = offer.details.aggregate(
+        price=Min("variant_price"),
+        delivery_time_in_days=Min("delivery_time_in_days"),
+    )
+    values["updated_at"] = timezone.now()
+    type(offer).objects.filter(pk=offer.pk).update(**values)
+    for field, value in values.items():
+        setattr(offer, field, value)
+
+
+OFFER_DETAIL_FIELDS = {
+    "title": "variant_title",
+    "price": "variant_price",
+    "revisions": "revision_limit",
+    "delivery_time_in_days": "delivery_time_in_days",
+    "features": "features",
+    "offer_type": "offer_type",
+}
+
+
+def build_offer_detail(offer, detail_data):
+    """
+    Builds an unsaved detail from API data ("title", "price", ...).
+    """
+    from coder_app.models import OfferDetail
+
+    return OfferDetail(
+        offer=offer,
+        **{field: detail_data[key] for key, field in OFFER_DETAIL_FIELDS.items()},
+    )
+
+
+def apply_offer_detail_data(detail, detail_data):
+    """
+    Copies the fields present in ``detail_data`` onto an existing detail.
+    Accepts both API names ("title") and model field names ("variant_title").
+    """
+    for key, field in OFFER_DETAIL_FIELDS.items():
+        if field in detail_data:
+            setattr(detail, field, detail_data[field])
+        elif key in detail_data:
+            setattr(detail, field, detail_data[key])
+
+
+def save_offer_details(offer, created=(), updated=(), deleted_ids=()):
+    """
+    Writes all detail changes of one offer with one statement per kind of
+    change inside a single transaction, then refreshes the offer's minimum
+    values. Bulk writes skip model signals, so the offer response cache is
+    invalidated explicitly.
+    """
+    from coder_app.models import OfferDetail
+
+    with transaction.atomic():
+        if created:
+            OfferDetail.objects.bulk_create(created)
+        if updated:
+            OfferDetail.objects.bulk_update(updated, list(OFFER_DETAIL_FIELDS.values()))
+        if deleted_ids:
+            OfferDetail.objects.filter(id__in=deleted_ids).delete()
+        sync_offer_min_values(offer)
+    bump_offer_cache_version()
+
+
+def min_detail_subquery(field):
+    """
+    Returns a subquery selecting the smallest detail value of the outer offer.
+    """
+    from coder_app.models import OfferDetail
+
+    return Subquery(
+        OfferDetail.objects.filter(offer=OuterRef("pk"))
+        .order_by()
+        .values("offer")
+        .annotate(value=Min(field))
+        .values("value")
+    )
+
+
+def refresh_offer_min_values(offers):
+    """
+    Recomputes the denormalized minimum columns for a queryset of offers
+    in a single UPDATE statement.
+    """
+    return offers.update(
+        price=min_detail_subquery("variant_price"),
+        delivery_time_in_days=min_detail_subquery("delivery_time_in_days"),
+    )
+
+
+# End of offer_logic.py
+
+
+# businessStats_logic.py
+ORDER_STATUS_FIELDS = {
+    "pending": "pending_orders",
+    "in_progress": "in_progress_orders",
+    "completed": "completed_orders",
+    "cancelled": "cancelled_orders",
+}
+BUSINESS_STATS_FIELDS = ("rating_sum", "rating_count", *ORDER_STATUS_FIELDS.values())
+
+
+def compute_business_stats(user_ids=None):
+    """
+    Aggregates review and order totals per business user with two
+    GROUP BY queries. Returns {user_id: {field: value}}.
+    """
+    from coder_app.models import Order, Review
+
+    reviews = Review.objects.order_by()
+    orders = Order.objects.order_by()
+    if user_ids is not None:
+        reviews = reviews.filter(business_user_id__in=user_ids)
+        orders = orders.filter(business_user_id__in=user_ids)
+
+    stats = {}
+
+    def row(user_id):
+        return stats.setdefault(user_id, dict.fromkeys(BUSINESS_STATS_FIELDS, 0))
+
+    for entry in reviews.values("business_user").annotate(
+        total=Sum("rating"), count=Count("id")
+    ):
+        values = row(entry["business_user"])
+        values["rating_sum"] = entry["total"] or 0
+        values["rating_count"] = entry["count"]
+
+    for entry in orders.values("business_user", "status").annotate(count=Count("id")):
+        field = ORDER_STATUS_FIELDS.get(entry["status"])
+        if field:
+            row(entry["business_user"])[field] = entry["count"]
+    return stats
+
+
+def reconcile_business_stats(user_ids=None):
+    """
+    Rewrites the business stats rows from the review and order tables.
+    Rows of users without any activity are reset to zero.
+    """
+    from coder_app.models import BusinessStats
+
+    stats = compute_business_stats(user_ids)
+    existing = BusinessStats.objects.all()
+    if user_ids is not None:
+        existing = existing.filter(user_id__in=user_ids)
+    for user_id in existing.values_list("user_id", flat=True):
+        stats.setdefault(user_id, dict.fromkeys(BUSINESS_STATS_FIELDS, 0))
+
+    now = timezone.now()
+    BusinessStats.objects.bulk_create(
+        [
+            BusinessStats(user_id=user_id, updated_at=now, **values)
+            for user_id, values in stats.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=[*BUSINESS_STATS_FIELDS, "updated_at"],
+    )
+    return len(stats)
+
+
+def adjust_business_stats(user_id, create_missing=True, **deltas):
+    """
+    Applies counter deltas for one business user in a single UPDATE.
+    A missing row is rebuilt from the live tables unless ``create_missing``
+    is False, which deletes use because the row may be cascading away.
+    Decrements stop at zero, so drift from writes that bypassed the signals
+    never fails the user's save; reconcile_business_stats repairs it.
+    """
+    from coder_app.models import BusinessStats
+
+    changes = {
+        field: F(field) + delta if delta > 0 else Greatest(F(field) + delta, 0)
+        for field, delta in deltas.items()
+        if delta
+    }
+    if not user_id or not changes:
+        return
+    updated = BusinessStats.objects.filter(user_id=user_id).update(
+        **changes, updated_at=timezone.now()
+    )
+    if not updated and create_missing:
+        reconcile_business_stats([user_id])
+
+
+def get_business_stats(user):
+    """
+    Returns the stats of a business user, or an empty unsaved row when the
+    user has no reviews or orders yet.
+    """
+    from coder_app.models import BusinessStats
+
+    try:
+        return user.business_stats
+    except BusinessStats.DoesNotExist:
+        return BusinessStats(user=user)
+
+
+# End of businessStats_logic.py